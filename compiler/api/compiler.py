@@ -42,6 +42,41 @@ INT_RE = re.compile(r"int(\d+)")
 
 CORE_TYPES = ["int", "long", "int128", "int256", "double", "bytes", "string", "Bool", "true"]
 
+# How core types are read. Numbers come straight from the TLReader, skipping the primitives' classmethods
+CORE_READERS = {
+    "int": "b.read_int()",
+    "long": "b.read_long()",
+    "int128": "b.read_large_int(16)",
+    "int256": "b.read_large_int(32)",
+    "double": "b.read_double()",
+    "bytes": "Bytes.read(b)",
+    "string": "String.read(b)",
+    "Bool": "Bool.read(b)"
+}
+
+# How core types are written into the TLWriter and how many bytes they take
+CORE_WRITERS = {
+    "int": "b.write_int({})",
+    "long": "b.write_long({})",
+    "int128": "b.write_large_int({}, 16)",
+    "int256": "b.write_large_int({}, 32)",
+    "double": "b.write_double({})",
+    "bytes": "b.write_bytes({})",
+    "string": "b.write_string({})",
+    "Bool": "b.write_bool({})"
+}
+
+CORE_SIZES = {
+    "int": "4",
+    "long": "8",
+    "int128": "16",
+    "int256": "32",
+    "double": "8",
+    "bytes": "TLWriter.bytes_size({})",
+    "string": "TLWriter.string_size({})",
+    "Bool": "4"
+}
+
 WARNING = """
 # # # # # # # # # # # # # # # # # # # # # # # #
 #               !!! WARNING !!!               #
@@ -445,7 +480,7 @@ def start(format: bool = False):
                              f"            :nosignatures:\n\n" \
                              f"            " + references
 
-        write_types = read_types = "" if c.has_flags else "# No flags\n        "
+        write_types = read_types = size_types = "" if c.has_flags else "# No flags\n        "
 
         for arg_name, arg_type in c.args:
             flag = FLAGS_RE_2.match(arg_type)
@@ -469,11 +504,12 @@ def start(format: bool = False):
                 write_flags = "\n        ".join([
                     f"{arg_name} = 0",
                     "\n        ".join(write_flags),
-                    f"b.write(Int({arg_name}))\n        "
+                    f"b.write_int({arg_name})\n        "
                 ])
 
                 write_types += write_flags
-                read_types += f"\n        {arg_name} = Int.read(b)\n        "
+                size_types += "\n        size += 4\n        "
+                read_types += f"\n        {arg_name} = b.read_int()\n        "
 
                 continue
 
@@ -486,16 +522,26 @@ def start(format: bool = False):
                 elif flag_type in CORE_TYPES:
                     write_types += "\n        "
                     write_types += f"if self.{arg_name} is not None:\n            "
-                    write_types += f"b.write({flag_type.title()}(self.{arg_name}))\n        "
+                    write_types += CORE_WRITERS[flag_type].format(f"self.{arg_name}") + "\n        "
+
+                    size_types += "\n        "
+                    size_types += f"if self.{arg_name} is not None:\n            "
+                    size_types += "size += " + CORE_SIZES[flag_type].format(f"self.{arg_name}") + "\n        "
 
                     read_types += "\n        "
-                    read_types += f"{arg_name} = {flag_type.title()}.read(b) if flags{number} & (1 << {index}) else None"
+                    read_types += f"{arg_name} = {CORE_READERS[flag_type]} if flags{number} & (1 << {index}) else None"
                 elif "vector" in flag_type.lower():
                     sub_type = arg_type.split("<")[1][:-1]
 
                     write_types += "\n        "
                     write_types += f"if self.{arg_name} is not None:\n            "
-                    write_types += "b.write(Vector(self.{}{}))\n        ".format(
+                    write_types += "Vector.write_into(b, self.{}{})\n        ".format(
+                        arg_name, f", {sub_type.title()}" if sub_type in CORE_TYPES else ""
+                    )
+
+                    size_types += "\n        "
+                    size_types += f"if self.{arg_name} is not None:\n            "
+                    size_types += "size += Vector.size_of(self.{}{})\n        ".format(
                         arg_name, f", {sub_type.title()}" if sub_type in CORE_TYPES else ""
                     )
 
@@ -506,22 +552,34 @@ def start(format: bool = False):
                 else:
                     write_types += "\n        "
                     write_types += f"if self.{arg_name} is not None:\n            "
-                    write_types += f"b.write(self.{arg_name}.write())\n        "
+                    write_types += f"self.{arg_name}.write_to(b)\n        "
+
+                    size_types += "\n        "
+                    size_types += f"if self.{arg_name} is not None:\n            "
+                    size_types += f"size += self.{arg_name}.byte_size()\n        "
 
                     read_types += "\n        "
                     read_types += f"{arg_name} = TLObject.read(b) if flags{number} & (1 << {index}) else None\n        "
             else:
                 if arg_type in CORE_TYPES:
                     write_types += "\n        "
-                    write_types += f"b.write({arg_type.title()}(self.{arg_name}))\n        "
+                    write_types += CORE_WRITERS[arg_type].format(f"self.{arg_name}") + "\n        "
+
+                    size_types += "\n        "
+                    size_types += "size += " + CORE_SIZES[arg_type].format(f"self.{arg_name}") + "\n        "
 
                     read_types += "\n        "
-                    read_types += f"{arg_name} = {arg_type.title()}.read(b)\n        "
+                    read_types += f"{arg_name} = {CORE_READERS[arg_type]}\n        "
                 elif "vector" in arg_type.lower():
                     sub_type = arg_type.split("<")[1][:-1]
 
                     write_types += "\n        "
-                    write_types += "b.write(Vector(self.{}{}))\n        ".format(
+                    write_types += "Vector.write_into(b, self.{}{})\n        ".format(
+                        arg_name, f", {sub_type.title()}" if sub_type in CORE_TYPES else ""
+                    )
+
+                    size_types += "\n        "
+                    size_types += "size += Vector.size_of(self.{}{})\n        ".format(
                         arg_name, f", {sub_type.title()}" if sub_type in CORE_TYPES else ""
                     )
 
@@ -531,7 +589,10 @@ def start(format: bool = False):
                     )
                 else:
                     write_types += "\n        "
-                    write_types += f"b.write(self.{arg_name}.write())\n        "
+                    write_types += f"self.{arg_name}.write_to(b)\n        "
+
+                    size_types += "\n        "
+                    size_types += f"size += self.{arg_name}.byte_size()\n        "
 
                     read_types += "\n        "
                     read_types += f"{arg_name} = TLObject.read(b)\n        "
@@ -551,6 +612,7 @@ def start(format: bool = False):
             fields=fields,
             read_types=read_types,
             write_types=write_types,
+            size_types=size_types,
             return_arguments=return_arguments
         )
 
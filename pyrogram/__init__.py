@@ -20,8 +20,6 @@ __version__ = "2.1.0.1"
 __license__ = "GNU Lesser General Public License v3.0 (LGPL-3.0)"
 __copyright__ = "Copyright (C) 2017-present Dan <https://github.com/delivrance>"
 
-from concurrent.futures.thread import ThreadPoolExecutor
-
 
 class StopTransmission(Exception):  # noqa: N818
     pass
@@ -35,10 +33,13 @@ class ContinuePropagation(StopAsyncIteration):
     pass
 
 
-crypto_executor = ThreadPoolExecutor(1, thread_name_prefix="CryptoWorker")
-
 # ruff: noqa: E402
 
+from .crypto.executor import create_executor
+
+# Can be replaced (e.g.: with create_executor(workers=8)) before any client is started
+crypto_executor = create_executor()
+
 from . import enums, errors, filters, handlers, raw, types
 from .client import Client
 from .methods.utilities.compose import compose
@@ -20,11 +20,13 @@ import asyncio
 import functools
 import inspect
 import logging
+import math
 import os
 import platform
 import re
 import shutil
 import sys
+from concurrent.futures import Executor
 from concurrent.futures.thread import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from hashlib import sha256
@@ -32,7 +34,7 @@ from importlib import import_module
 from io import StringIO, BytesIO
 from mimetypes import MimeTypes
 from pathlib import Path
-from typing import Union, List, Optional, Callable, AsyncGenerator
+from typing import Union, List, Optional, Callable, AsyncGenerator, Awaitable, Tuple
 
 import builtins
 import pyrogram
@@ -41,18 +43,18 @@ from .formatter import Formatter as fmt
 from pyrogram import enums
 from pyrogram import raw
 from pyrogram import utils
-from pyrogram.crypto import aes
-from pyrogram.errors import CDNFileHashMismatch
+from pyrogram.crypto import aes, executor as crypto_executor
+from pyrogram.errors import CDNFileHashMismatch, FileReferenceExpired
 from pyrogram.errors import (
     SessionPasswordNeeded,
     VolumeLocNotFound, ChannelPrivate,
-    BadRequest, AuthBytesInvalid
+    BadRequest
 )
-from .connection import Connection
-from .connection.transport import TCP, TCPAbridged
+from .connection import Connection, ProxyPool
+from .connection.transport import TCP, SocketOptions, TCPAbridged
 from pyrogram.handlers.handler import Handler
 from pyrogram.methods import Methods
-from pyrogram.session import Auth, Session
+from pyrogram.session import Auth, Session, SessionPool, RequestRouter, RoutingPolicy, CompressionPolicy
 from pyrogram.storage import FileStorage, MemoryStorage
 from pyrogram.types import User, TermsOfService, Message, CallbackQuery
 from pyrogram.types.pyromod import ListenerTypes
@@ -62,7 +64,7 @@ from .dispatcher import Dispatcher
 from .file_id import FileId, FileType, ThumbnailSource
 from .mime_types import mime_types
 from .parser import Parser
-from .session.internals import MsgId
+from .session.internals import DcOptions, MsgId
 
 log = logging.getLogger(__name__)
 
@@ -102,10 +104,12 @@ class Client(Methods):
             Pass True to connect to Telegram using IPv6.
             Defaults to False (IPv4).
 
-        proxy (``dict``, *optional*):
+        proxy (``dict`` | :obj:`~pyrogram.connection.ProxyPool`, *optional*):
             The Proxy settings as dict.
             E.g.: *dict(scheme="socks5", hostname="11.22.33.44", port=1234, username="user", password="pass")*.
             The *username* and *password* can be omitted if the proxy doesn't require authorization.
+            Pass a :obj:`~pyrogram.connection.ProxyPool` instead to spread the connections across several proxies,
+            which can be shared by many clients.
 
         test_mode (``bool``, *optional*):
             Enable or disable login to the test servers.
@@ -183,6 +187,53 @@ class Client(Methods):
             Set the maximum amount of concurrent transmissions (uploads & downloads).
             A value that is too high may result in network related issues.
             Defaults to 1.
+
+        upload_workers (``int``, *optional*):
+            Set the maximum amount of file parts uploaded in parallel for a single file. The actual amount adapts
+            to the observed latency and flood waits.
+            Defaults to 8.
+
+        download_workers (``int``, *optional*):
+            Set the amount of file parts requested in parallel while downloading a single file.
+            Defaults to 4.
+
+        max_media_sessions (``int``, *optional*):
+            Set the maximum amount of media connections opened to a single data center. File parts are spread
+            across these connections, which are shared by uploads and downloads and kept open until the client
+            is stopped.
+            Defaults to 2.
+
+        max_concurrent_requests (``int``, *optional*):
+            Set the maximum amount of requests awaiting an answer on a single connection. Further requests wait for
+            a free slot, which is handed out in turns across the kinds of requests waiting, so that a burst of
+            slow requests doesn't hold back the others.
+            Defaults to 32.
+
+        main_sessions (``int``, *optional*):
+            Set the amount of connections opened to the home DC once the client is started. API calls are spread
+            across them by *routing_policy*, while updates are only received through the first one. Extra
+            connections avoid small requests being stuck behind large answers on the same connection.
+            Defaults to 1.
+
+        routing_policy (:obj:`~pyrogram.session.RoutingPolicy`, *optional*):
+            Pick the connection each API call is sent through when *main_sessions* is greater than 1.
+            Available policies are :obj:`~pyrogram.session.RoundRobin`, :obj:`~pyrogram.session.LeastInFlight` and
+            :obj:`~pyrogram.session.Lanes`, which keeps the first connection for interactive calls.
+            Defaults to :obj:`~pyrogram.session.LeastInFlight`.
+
+        compression_policy (:obj:`~pyrogram.session.CompressionPolicy`, *optional*):
+            Pass a policy to send large requests gzip-compressed, which saves upstream bandwidth at the cost of some
+            CPU time. The policy decides which requests are compressed and counts the bytes saved.
+            Defaults to None (requests are never compressed).
+
+        socket_options (:obj:`~pyrogram.connection.transport.SocketOptions`, *optional*):
+            Socket level options (TCP_NODELAY, buffer sizes, keepalive, fast open, source address) applied to the
+            connections used for API calls, whether direct or through a proxy.
+            Defaults to TCP_NODELAY enabled and the system defaults for everything else.
+
+        media_socket_options (:obj:`~pyrogram.connection.transport.SocketOptions`, *optional*):
+            Same as *socket_options*, for the connections used to upload and download files.
+            Defaults to TCP_NODELAY enabled and 1 MiB send and receive buffers.
     """
 
     APP_VERSION = f"Pyrogram {__version__}"
@@ -201,6 +252,14 @@ class Client(Methods):
     UPDATES_WATCHDOG_INTERVAL = 5 * 60
 
     MAX_CONCURRENT_TRANSMISSIONS = 1
+    UPLOAD_WORKERS = 8
+    DOWNLOAD_WORKERS = 4
+    MAX_MEDIA_SESSIONS = 2
+    MAX_CONCURRENT_REQUESTS = 32
+    MAIN_SESSIONS = 1
+    MEDIA_SOCKET_BUFFER = 1024 * 1024
+    DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+    FILE_REFERENCE_REFRESH_RETRIES = 3
 
     mimetypes = MimeTypes()
     mimetypes.readfp(StringIO(mime_types))
@@ -215,7 +274,7 @@ class Client(Methods):
         system_version: str = SYSTEM_VERSION,
         lang_code: str = LANG_CODE,
         ipv6: bool = False,
-        proxy: dict = None,
+        proxy: Union[dict, ProxyPool] = None,
         test_mode: bool = False,
         bot_token: str = None,
         session_string: str = None,
@@ -232,6 +291,15 @@ class Client(Methods):
         sleep_threshold: int = Session.SLEEP_THRESHOLD,
         hide_password: bool = False,
         max_concurrent_transmissions: int = MAX_CONCURRENT_TRANSMISSIONS,
+        upload_workers: int = UPLOAD_WORKERS,
+        download_workers: int = DOWNLOAD_WORKERS,
+        max_media_sessions: int = MAX_MEDIA_SESSIONS,
+        max_concurrent_requests: int = MAX_CONCURRENT_REQUESTS,
+        main_sessions: int = MAIN_SESSIONS,
+        routing_policy: RoutingPolicy = None,
+        compression_policy: CompressionPolicy = None,
+        socket_options: SocketOptions = None,
+        media_socket_options: SocketOptions = None,
         connection_factory: builtins.type[Connection] = Connection,
         protocol_factory: builtins.type[TCP] = TCPAbridged,
         message_cache_size: int = 1000,
@@ -263,12 +331,27 @@ class Client(Methods):
         self.sleep_threshold = sleep_threshold
         self.hide_password = hide_password
         self.max_concurrent_transmissions = max_concurrent_transmissions
+        self.upload_workers = upload_workers
+        self.download_workers = download_workers
+        self.max_media_sessions = max_media_sessions
+        self.max_concurrent_requests = max_concurrent_requests
+        self.main_sessions = main_sessions
+        self.routing_policy = routing_policy
+        self.compression_policy = compression_policy
+        self.socket_options = socket_options or SocketOptions()
+        self.media_socket_options = media_socket_options or SocketOptions(
+            send_buffer=self.MEDIA_SOCKET_BUFFER,
+            recv_buffer=self.MEDIA_SOCKET_BUFFER
+        )
         self.connection_factory = connection_factory
         self.protocol_factory = protocol_factory
         self.message_cache_size = message_cache_size
 
         self.executor = ThreadPoolExecutor(self.workers, thread_name_prefix="Handler")
 
+        # Addresses of the DCs, learned from help.getConfig and kept in the storage
+        self.dc_options = DcOptions()
+
         if self.session_string:
             self.storage = MemoryStorage(self.name, self.session_string)
         elif self.in_memory:
@@ -284,8 +367,10 @@ class Client(Methods):
 
         self.session = None
 
-        self.media_sessions = {}
-        self.media_sessions_lock = asyncio.Lock()
+        self.request_router = RequestRouter(self, main_sessions, routing_policy) if main_sessions > 1 else None
+
+        self.media_session_pools = {}
+        self.cdn_session_pools = {}
 
         self.save_file_semaphore = asyncio.Semaphore(self.max_concurrent_transmissions)
         self.get_file_semaphore = asyncio.Semaphore(self.max_concurrent_transmissions)
@@ -308,6 +393,10 @@ class Client(Methods):
         self.updates_watchdog_event = asyncio.Event()
         self.last_update_time = datetime.now()
 
+        # The last known state of the common updates sequence, where the difference starts from when updates are lost
+        self.updates_pts = None
+        self.updates_date = None
+
         self.listeners = {listener_type: [] for listener_type in ListenerTypes}
 
         self.loop = asyncio.get_event_loop()
@@ -686,6 +775,8 @@ class Client(Methods):
         self.last_update_time = datetime.now()
 
         if isinstance(updates, (raw.types.Updates, raw.types.UpdatesCombined)):
+            self.updates_date = updates.date
+
             is_min = any((
                 await self.fetch_peers(updates.users),
                 await self.fetch_peers(updates.chats),
@@ -704,6 +795,10 @@ class Client(Methods):
                 pts = getattr(update, "pts", None)
                 pts_count = getattr(update, "pts_count", None)
 
+                # Channels have sequences of their own
+                if pts is not None and channel_id is None:
+                    self.updates_pts = pts
+
                 if isinstance(update, raw.types.UpdateChannelTooLong):
                     log.info(update)
 
@@ -738,6 +833,9 @@ class Client(Methods):
 
                 self.dispatcher.updates_queue.put_nowait((update, users, chats))
         elif isinstance(updates, (raw.types.UpdateShortMessage, raw.types.UpdateShortChatMessage)):
+            self.updates_pts = updates.pts
+            self.updates_date = updates.date
+
             diff = await self.invoke(
                 raw.functions.updates.GetDifference(
                     pts=updates.pts - updates.pts_count, date=updates.date, qts=-1
@@ -757,13 +855,62 @@ class Client(Methods):
             elif diff.other_updates:  # The other_updates list can be empty
                 self.dispatcher.updates_queue.put_nowait((diff.other_updates[0], {}, {}))
         elif isinstance(updates, raw.types.UpdateShort):
+            self.updates_date = updates.date
             self.dispatcher.updates_queue.put_nowait((updates.update, {}, {}))
         elif isinstance(updates, raw.types.UpdatesTooLong):
             log.info(updates)
+            await self.get_difference()
+
+    async def get_difference(self):
+        # Updates were lost, by the server or by a session whose updates queue was full
+        if self.updates_pts is None:
+            log.warning("Unable to get the difference, the updates state is unknown")
+            return
+
+        while True:
+            diff = await self.invoke(
+                raw.functions.updates.GetDifference(pts=self.updates_pts, date=self.updates_date, qts=-1)
+            )
+
+            if isinstance(diff, raw.types.updates.DifferenceEmpty):
+                self.updates_date = diff.date
+                return
+
+            # Too much was missed, the server tells where to start over from
+            if isinstance(diff, raw.types.updates.DifferenceTooLong):
+                self.updates_pts = diff.pts
+                continue
+
+            users = {u.id: u for u in diff.users}
+            chats = {c.id: c for c in diff.chats}
+
+            for message in diff.new_messages:
+                self.dispatcher.updates_queue.put_nowait((
+                    raw.types.UpdateNewMessage(message=message, pts=0, pts_count=0),
+                    users,
+                    chats,
+                ))
+
+            for update in diff.other_updates:
+                self.dispatcher.updates_queue.put_nowait((update, users, chats))
+
+            # The difference comes in slices, each one ending at an intermediate state
+            state = diff.state if isinstance(diff, raw.types.updates.Difference) else diff.intermediate_state
+
+            self.updates_pts = state.pts
+            self.updates_date = state.date
+
+            if isinstance(diff, raw.types.updates.Difference):
+                return
 
     async def load_session(self):
         await self.storage.open()
 
+        try:
+            self.dc_options.load(await self.storage.get_dc_options())
+        except NotImplementedError:
+            pass
+
         session_empty = any([
             await self.storage.test_mode() is None,
             await self.storage.auth_key() is None,
@@ -927,19 +1074,104 @@ class Client(Methods):
                 log.warning('[%s] No plugin loaded from "%s"', self.name, root)
 
     async def handle_download(self, packet):
-        file_id, directory, file_name, in_memory, file_size, progress, progress_args = packet
+        (
+            file_id, directory, file_name, in_memory, file_size, progress, progress_args,
+            workers, byte_offset, byte_limit, refresh_file_id
+        ) = packet
 
         os.makedirs(directory, exist_ok=True) if not in_memory else None
         temp_file_path = os.path.abspath(re.sub("\\\\", "/", os.path.join(directory, file_name))) + ".temp"
-        file = BytesIO() if in_memory else open(temp_file_path, "wb")
+        chunk_size = self.DOWNLOAD_CHUNK_SIZE
+
+        byte_offset = byte_offset or 0
+
+        if byte_offset < 0:
+            byte_offset += file_size
+
+        end = byte_offset + byte_limit if byte_limit else file_size or None
+        sink_size = end - byte_offset if end is not None else None
+
+        def first_missing_position() -> int:
+            position = byte_offset
+
+            while position // chunk_size in parts and (end is None or position < end):
+                position = (position // chunk_size + 1) * chunk_size
+
+            return position if end is None else min(position, end)
+
+        if in_memory:
+            parts = set()
+            journal = None
+            position = byte_offset
+            sink = MemorySink(sink_size)
+        else:
+            journal = DownloadJournal(
+                temp_file_path + ".parts",
+                f"{file_id.media_id}:{file_id.thumbnail_size}:{file_size}:{byte_offset}:{byte_limit}"
+            )
+            parts = journal.open() if os.path.exists(temp_file_path) else journal.open(reset=True)
+            position = first_missing_position()
+
+            if parts and sink_size is None:
+                # Never trust the journal past the data that actually made it to the disk
+                written = byte_offset + os.path.getsize(temp_file_path)
+
+                if written < position:
+                    position = max(byte_offset, written // chunk_size * chunk_size)
+
+            sink = FileSink(
+                self.loop, self.executor, temp_file_path, sink_size, position - byte_offset, resume=bool(parts)
+            )
+
+            if position > byte_offset:
+                log.info("Resuming download of %s from byte %s", file_name, position)
 
         try:
-            async for chunk in self.get_file(file_id, file_size, 0, 0, progress, progress_args):
-                file.write(chunk)
+            for attempt in range(self.FILE_REFERENCE_REFRESH_RETRIES + 1):
+                # The journal may say the whole range is already there
+                if end is not None and position >= end:
+                    break
+
+                try:
+                    async for chunk_position, chunk in self.get_file(
+                        file_id, file_size, 0, 0, progress, progress_args, workers,
+                        byte_offset=position,
+                        byte_limit=end - position if byte_limit else None,
+                        ordered=False
+                    ):
+                        await sink.write(chunk_position - byte_offset, chunk)
+
+                        if chunk:
+                            if journal is not None:
+                                journal.add(chunk_position // chunk_size)
+                            else:
+                                parts.add(chunk_position // chunk_size)
+                except FileReferenceExpired:
+                    if refresh_file_id is None or attempt == self.FILE_REFERENCE_REFRESH_RETRIES:
+                        raise
+
+                    # Chunks arrive out of order, so carry on from the first one that is still missing
+                    position = first_missing_position()
+
+                    log.info("File reference expired, refreshing it and resuming from byte %s", position)
+                    file_id = await refresh_file_id()
+                else:
+                    break
+
+            if end is not None and any(
+                part not in parts for part in range(byte_offset // chunk_size, math.ceil(end / chunk_size))
+            ):
+                raise ConnectionError(f"Download of {file_name} stopped at byte {first_missing_position()}")
         except BaseException as e:
+            await sink.close()
+
             if not in_memory:
-                file.close()
-                os.remove(temp_file_path)
+                journal.close()
+
+                # Keep the partial file around to resume it later, unless the transmission was stopped on purpose
+                if isinstance(e, pyrogram.StopTransmission):
+                    os.remove(temp_file_path)
+                    journal.remove()
 
             if isinstance(e, asyncio.CancelledError):
                 raise e
@@ -949,15 +1181,80 @@ class Client(Methods):
 
             return None
         else:
+            file = await sink.close()
+
             if in_memory:
                 file.name = file_name
                 return file
             else:
-                file.close()
+                journal.close()
+                journal.remove()
                 file_path = os.path.splitext(temp_file_path)[0]
                 shutil.move(temp_file_path, file_path)
                 return file_path
 
+    def get_session_pool(self, dc_id: int, is_cdn: bool = False) -> SessionPool:
+        pools = self.cdn_session_pools if is_cdn else self.media_session_pools
+        pool = pools.get(dc_id)
+
+        if pool is None:
+            pool = pools[dc_id] = SessionPool(self, dc_id, self.max_media_sessions, is_cdn=is_cdn)
+
+        return pool
+
+    async def get_file_parts(
+        self,
+        get_chunk: Callable[[int], Awaitable[bytes]],
+        first_chunk: bytes,
+        total: int,
+        chunk_size: int,
+        workers: int,
+        ordered: bool = True
+    ) -> AsyncGenerator[Tuple[int, bytes], None]:
+        """Yield up to *total* file parts together with their index, keeping up to *workers* part requests in flight.
+
+        The first part is already known. Parts are yielded in order, unless *ordered* is False, in which case they
+        are yielded as soon as they arrive. Parts following a short one (the end of the file) are never requested.
+        """
+        pending = {}
+        next_part = 1
+        is_eof = False
+
+        def schedule():
+            nonlocal next_part
+
+            while not is_eof and next_part < total and len(pending) < max(1, workers):
+                pending[next_part] = self.loop.create_task(get_chunk(next_part))
+                next_part += 1
+
+        try:
+            part, chunk = 0, first_chunk
+
+            while True:
+                is_eof = is_eof or len(chunk) < chunk_size
+                schedule()
+
+                yield part, chunk
+
+                if ordered:
+                    if is_eof or part + 1 not in pending:
+                        break
+
+                    part += 1
+                    chunk = await pending.pop(part)
+                else:
+                    if not pending:
+                        break
+
+                    done, _ = await asyncio.wait(pending.values(), return_when=asyncio.FIRST_COMPLETED)
+                    part = min(p for p, task in pending.items() if task in done)
+                    chunk = await pending.pop(part)
+        finally:
+            for task in pending.values():
+                task.cancel()
+
+            await asyncio.gather(*pending.values(), return_exceptions=True)
+
     async def get_file(
         self,
         file_id: FileId,
@@ -965,8 +1262,14 @@ class Client(Methods):
         limit: int = 0,
         offset: int = 0,
         progress: Callable = None,
-        progress_args: tuple = ()
-    ) -> Optional[AsyncGenerator[bytes, None]]:
+        progress_args: tuple = (),
+        workers: int = None,
+        byte_offset: int = None,
+        byte_limit: int = None,
+        ordered: bool = True
+    ) -> Optional[AsyncGenerator[Union[bytes, Tuple[int, bytes]], None]]:
+        # Chunks are yielded in file order. With ordered=False, (position, chunk) pairs are yielded instead, as soon
+        # as each chunk arrives, for consumers that write them straight to their position.
         async with self.get_file_semaphore:
             file_type = file_id.file_type
 
@@ -1007,47 +1310,42 @@ class Client(Methods):
                     thumb_size=file_id.thumbnail_size
                 )
 
-            current = 0
+            chunk_size = self.DOWNLOAD_CHUNK_SIZE
+            range_start = None
+            range_end = None
+
+            # Byte ranges are served by requesting the whole chunks they overlap and trimming them
+            if byte_offset is not None or byte_limit is not None:
+                # An empty range has nothing to fetch, while no limit at all means up to the end of the file
+                if byte_limit == 0:
+                    return
+
+                byte_offset = byte_offset or 0
+
+                if byte_offset < 0:
+                    if file_size == 0:
+                        raise ValueError("Negative offsets require the file size to be known")
+
+                    byte_offset = max(0, byte_offset + file_size)
+
+                offset = byte_offset // chunk_size
+                limit = math.ceil((byte_offset % chunk_size + byte_limit) / chunk_size) if byte_limit is not None else 0
+                range_start = byte_offset
+                range_end = byte_offset + byte_limit if byte_limit is not None else None
+
             total = abs(limit) or (1 << 31) - 1
-            chunk_size = 1024 * 1024
             offset_bytes = abs(offset) * chunk_size
+            first_offset = offset_bytes
+            cdn_hashes = None
+
+            if workers is None:
+                workers = self.download_workers
 
             dc_id = file_id.dc_id
 
             try:
-                session = self.media_sessions.get(dc_id)
-                if not session:
-                    session = self.media_sessions[dc_id] = Session(
-                        self, dc_id,
-                        await Auth(self, dc_id, await self.storage.test_mode()).create()
-                        if dc_id != await self.storage.dc_id()
-                        else await self.storage.auth_key(),
-                        await self.storage.test_mode(),
-                        is_media=True
-                    )
-                    await session.start()
-
-                    if dc_id != await self.storage.dc_id():
-                        for _ in range(3):
-                            exported_auth = await self.invoke(
-                                raw.functions.auth.ExportAuthorization(
-                                    dc_id=dc_id
-                                )
-                            )
-
-                            try:
-                                await session.invoke(
-                                    raw.functions.auth.ImportAuthorization(
-                                        id=exported_auth.id,
-                                        bytes=exported_auth.bytes
-                                    )
-                                )
-                            except AuthBytesInvalid:
-                                continue
-                            else:
-                                break
-                        else:
-                            raise AuthBytesInvalid
+                pool = self.get_session_pool(dc_id)
+                session = await pool.get()
 
                 r = await session.invoke(
                     raw.functions.upload.GetFile(
@@ -1059,127 +1357,121 @@ class Client(Methods):
                 )
 
                 if isinstance(r, raw.types.upload.File):
-                    while True:
-                        chunk = r.bytes
-
-                        yield chunk
-
-                        current += 1
-                        offset_bytes += chunk_size
-
-                        if progress:
-                            func = functools.partial(
-                                progress,
-                                min(offset_bytes, file_size)
-                                if file_size != 0
-                                else offset_bytes,
-                                file_size,
-                                *progress_args
-                            )
+                    async def get_chunk(part: int) -> bytes:
+                        part_session = await pool.get()
 
-                            if inspect.iscoroutinefunction(progress):
-                                await func()
-                            else:
-                                await self.loop.run_in_executor(self.executor, func)
-
-                        if len(chunk) < chunk_size or current >= total:
-                            break
-
-                        r = await session.invoke(
+                        part_r = await part_session.invoke(
                             raw.functions.upload.GetFile(
                                 location=location,
-                                offset=offset_bytes,
+                                offset=first_offset + part * chunk_size,
                                 limit=chunk_size
                             ),
                             sleep_threshold=30
                         )
 
+                        return part_r.bytes
+
+                    first_chunk = r.bytes
                 elif isinstance(r, raw.types.upload.FileCdnRedirect):
-                    cdn_session = Session(
-                        self, r.dc_id, await Auth(self, r.dc_id, await self.storage.test_mode()).create(),
-                        await self.storage.test_mode(), is_media=True, is_cdn=True
-                    )
+                    cdn_pool = self.get_session_pool(r.dc_id, is_cdn=True)
+                    cdn_redirect = r
+
+                    async def get_cdn_hashes(hashes_offset: int) -> List["raw.types.FileHash"]:
+                        return await (await pool.get()).invoke(
+                            raw.functions.upload.GetCdnFileHashes(
+                                file_token=cdn_redirect.file_token,
+                                offset=hashes_offset
+                            )
+                        )
 
-                    try:
-                        await cdn_session.start()
+                    cdn_hashes = CdnFileHashes(get_cdn_hashes, file_size, cdn_redirect.file_hashes)
+
+                    async def get_chunk(part: int) -> bytes:
+                        chunk_offset = first_offset + part * chunk_size
 
                         while True:
-                            r2 = await cdn_session.invoke(
+                            r2 = await (await cdn_pool.get()).invoke(
                                 raw.functions.upload.GetCdnFile(
-                                    file_token=r.file_token,
-                                    offset=offset_bytes,
+                                    file_token=cdn_redirect.file_token,
+                                    offset=chunk_offset,
                                     limit=chunk_size
                                 )
                             )
 
-                            if isinstance(r2, raw.types.upload.CdnFileReuploadNeeded):
-                                try:
-                                    await session.invoke(
+                            if not isinstance(r2, raw.types.upload.CdnFileReuploadNeeded):
+                                break
+
+                            try:
+                                cdn_hashes.add(
+                                    await (await pool.get()).invoke(
                                         raw.functions.upload.ReuploadCdnFile(
-                                            file_token=r.file_token,
+                                            file_token=cdn_redirect.file_token,
                                             request_token=r2.request_token
                                         )
                                     )
-                                except VolumeLocNotFound:
-                                    break
-                                else:
-                                    continue
-
-                            chunk = r2.bytes
-
-                            # https://core.telegram.org/cdn#decrypting-files
-                            decrypted_chunk = aes.ctr256_decrypt(
-                                chunk,
-                                r.encryption_key,
-                                bytearray(
-                                    r.encryption_iv[:-4]
-                                    + (offset_bytes // 16).to_bytes(4, "big")
                                 )
-                            )
+                            except VolumeLocNotFound:
+                                return b""
+
+                        hashes = await cdn_hashes.get(chunk_offset, len(r2.bytes))
+
+                        return await crypto_executor.run(
+                            decrypt_cdn_chunk,
+                            r2.bytes,
+                            cdn_redirect.encryption_key,
+                            cdn_redirect.encryption_iv,
+                            chunk_offset,
+                            hashes,
+                            size=len(r2.bytes)
+                        )
 
-                            hashes = await session.invoke(
-                                raw.functions.upload.GetCdnFileHashes(
-                                    file_token=r.file_token,
-                                    offset=offset_bytes
-                                )
-                            )
+                    first_chunk = await get_chunk(0)
+                else:
+                    return
 
-                            # https://core.telegram.org/cdn#verifying-files
-                            for i, h in enumerate(hashes):
-                                cdn_chunk = decrypted_chunk[h.limit * i: h.limit * (i + 1)]
-                                CDNFileHashMismatch.check(
-                                    h.hash == sha256(cdn_chunk).digest(),
-                                    "h.hash == sha256(cdn_chunk).digest()"
-                                )
+                if file_size:
+                    total = min(total, max(1, math.ceil((file_size - offset_bytes) / chunk_size)))
+                else:
+                    # Without a known size, parts past the end can't be told apart in advance
+                    workers = 1
 
-                            yield decrypted_chunk
+                parts = self.get_file_parts(get_chunk, first_chunk, total, chunk_size, workers, ordered)
 
-                            current += 1
-                            offset_bytes += chunk_size
+                async for part, chunk in parts:
+                    position = first_offset + part * chunk_size
 
-                            if progress:
-                                func = functools.partial(
-                                    progress,
-                                    min(offset_bytes, file_size) if file_size != 0 else offset_bytes,
-                                    file_size,
-                                    *progress_args
-                                )
+                    if range_start is not None:
+                        chunk = chunk[max(0, range_start - position):]
+                        position = max(position, range_start)
 
-                                if inspect.iscoroutinefunction(progress):
-                                    await func()
-                                else:
-                                    await self.loop.run_in_executor(self.executor, func)
+                    if range_end is not None:
+                        chunk = chunk[:max(0, range_end - position)]
 
-                            if len(chunk) < chunk_size or current >= total:
-                                break
-                    except Exception as e:
-                        raise e
-                    finally:
-                        await cdn_session.stop()
-            except pyrogram.StopTransmission:
+                    yield chunk if ordered else (position, chunk)
+
+                    offset_bytes += chunk_size
+
+                    if progress:
+                        func = functools.partial(
+                            progress,
+                            min(offset_bytes, file_size)
+                            if file_size != 0
+                            else offset_bytes,
+                            file_size,
+                            *progress_args
+                        )
+
+                        if inspect.iscoroutinefunction(progress):
+                            await func()
+                        else:
+                            await self.loop.run_in_executor(self.executor, func)
+            except (pyrogram.StopTransmission, FileReferenceExpired):
                 raise
             except Exception as e:
                 log.exception(e)
+            finally:
+                if cdn_hashes is not None:
+                    await cdn_hashes.close()
 
     def guess_mime_type(self, filename: str) -> Optional[str]:
         return self.mimetypes.guess_type(filename)[0]
@@ -1188,6 +1480,247 @@ class Client(Methods):
         return self.mimetypes.guess_extension(mime_type)
 
 
+def decrypt_cdn_chunk(chunk: bytes, key: bytes, iv: bytes, offset: int, hashes: list) -> bytes:
+    # https://core.telegram.org/cdn#decrypting-files
+    decrypted_chunk = aes.ctr256_decrypt(
+        chunk,
+        key,
+        bytearray(
+            iv[:-4]
+            + (offset // 16).to_bytes(4, "big")
+        )
+    )
+
+    # https://core.telegram.org/cdn#verifying-files
+    for h in hashes:
+        start = h.offset - offset
+        cdn_chunk = decrypted_chunk[start: start + h.limit]
+        CDNFileHashMismatch.check(
+            h.hash == sha256(cdn_chunk).digest(),
+            "h.hash == sha256(cdn_chunk).digest()"
+        )
+
+    return decrypted_chunk
+
+
+class CdnFileHashes:
+    """The SHA-256 hashes of a CDN file, fetched in batches and ahead of the parts being verified."""
+
+    def __init__(
+        self,
+        fetch: Callable[[int], Awaitable[List["raw.types.FileHash"]]],
+        file_size: int = 0,
+        hashes: List["raw.types.FileHash"] = None
+    ):
+        self.fetch = fetch
+        self.file_size = file_size
+        self.hashes = {}
+        self.pending = {}
+
+        self.add(hashes or [])
+
+    def add(self, hashes: List["raw.types.FileHash"]):
+        for h in hashes:
+            self.hashes[h.offset] = h
+
+    async def load(self, offset: int):
+        task = self.pending.get(offset)
+
+        if task is None:
+            task = self.pending[offset] = asyncio.get_event_loop().create_task(self.fetch(offset))
+            task.add_done_callback(lambda t: self.pending.pop(offset, None))
+
+        self.add(await asyncio.shield(task))
+
+    def prefetch(self, offset: int):
+        if offset in self.hashes or offset in self.pending:
+            return
+
+        if self.file_size and offset >= self.file_size:
+            return
+
+        task = self.pending[offset] = asyncio.get_event_loop().create_task(self.fetch(offset))
+
+        def done(t: asyncio.Task):
+            self.pending.pop(offset, None)
+
+            if not t.cancelled() and t.exception() is None:
+                self.add(t.result())
+
+        task.add_done_callback(done)
+
+    async def get(self, offset: int, length: int) -> List["raw.types.FileHash"]:
+        hashes = []
+        end = offset + length
+
+        while offset < end:
+            if offset not in self.hashes:
+                await self.load(offset)
+
+            h = self.hashes.get(offset)
+
+            CDNFileHashMismatch.check(h is not None and h.limit > 0, "h is not None and h.limit > 0")
+
+            hashes.append(h)
+            offset += h.limit
+
+        if self.hashes:
+            last = self.hashes[max(self.hashes)]
+            self.prefetch(last.offset + last.limit)
+
+        return hashes
+
+    async def close(self):
+        tasks = list(self.pending.values())
+
+        for task in tasks:
+            task.cancel()
+
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+class FileSink:
+    """Writes downloaded chunks straight to their position in a file, in any order.
+
+    The file is preallocated to its final size, when known, and every write happens on a separate thread so that the
+    event loop is never blocked by the disk.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, executor: Executor, path: str, size: int = None,
+                 position: int = 0, resume: bool = False):
+        self.loop = loop
+        self.executor = executor
+        self.file = open(path, "r+b" if resume else "wb")
+        self.lock = asyncio.Lock()
+
+        if size is None:
+            self.file.truncate(position)
+        elif os.fstat(self.file.fileno()).st_size != size:
+            self.preallocate(size)
+
+    def preallocate(self, size: int):
+        if hasattr(os, "posix_fallocate"):
+            try:
+                os.posix_fallocate(self.file.fileno(), 0, size)
+            except OSError:
+                pass
+
+        self.file.truncate(size)
+
+    def pwrite(self, data: bytes, position: int):
+        if hasattr(os, "pwrite"):
+            view = memoryview(data)
+
+            while view:
+                written = os.pwrite(self.file.fileno(), view, position)
+                view = view[written:]
+                position += written
+        else:
+            self.file.seek(position)
+            self.file.write(data)
+
+    async def write(self, position: int, data: bytes):
+        # Writes are serialized in case seek() and write() have to be used instead of pwrite()
+        async with self.lock:
+            await self.loop.run_in_executor(self.executor, self.pwrite, data, position)
+
+    async def close(self) -> None:
+        if not self.file.closed:
+            await self.loop.run_in_executor(self.executor, self.file.close)
+
+
+class MemorySink:
+    """Collects downloaded chunks in memory, in any order.
+
+    When the size is known, the buffer is allocated once and chunks are copied straight to their position.
+    """
+
+    def __init__(self, size: int = None):
+        self.file = BytesIO()
+        self.view = None
+
+        if size:
+            # Growing the buffer by writing its last byte allocates it in one go, already filled with zeros
+            self.file.seek(size - 1)
+            self.file.write(b"\x00")
+            self.view = self.file.getbuffer()
+
+    async def write(self, position: int, data: bytes):
+        if self.view is not None and position + len(data) > len(self.view):
+            # The size given was too small (e.g.: a stale file size), so the buffer grows as chunks come instead
+            self.view.release()
+            self.view = None
+
+        if self.view is not None:
+            self.view[position: position + len(data)] = data
+        else:
+            self.file.seek(position)
+            self.file.write(data)
+
+    async def close(self) -> BytesIO:
+        if self.view is not None:
+            self.view.release()
+            self.view = None
+
+        self.file.seek(0)
+
+        return self.file
+
+
+class DownloadJournal:
+    """On-disk record of the file parts already written to a temporary download file.
+
+    The first line identifies the download, each of the following lines holds the index of a completed part.
+    """
+
+    def __init__(self, path: str, key: str):
+        self.path = path
+        self.key = key
+        self.parts = set()
+        self.file = None
+
+    def open(self, reset: bool = False) -> set:
+        lines = []
+
+        if not reset:
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    # A line that was only partially written has no line break yet and is ignored
+                    lines = f.read().split("\n")[:-1]
+            except FileNotFoundError:
+                pass
+
+        if lines and lines[0] == self.key:
+            self.parts = {int(i) for i in lines[1:] if i.isdigit()}
+            self.file = open(self.path, "a", encoding="utf-8")
+        else:
+            self.parts = set()
+            self.file = open(self.path, "w", encoding="utf-8")
+            self.file.write(f"{self.key}\n")
+            self.file.flush()
+
+        return self.parts
+
+    def add(self, part: int):
+        if part in self.parts:
+            return
+
+        self.parts.add(part)
+        self.file.write(f"{part}\n")
+        self.file.flush()
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def remove(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
 class Cache:
     def __init__(self, capacity: int):
         self.capacity = capacity
@@ -17,5 +17,6 @@
 #  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
 from .connection import Connection
+from .proxy_pool import ProxyPool
 
-__all__ = ["Connection"]
+__all__ = ["Connection", "ProxyPool"]
@@ -22,9 +22,10 @@ import asyncio
 import logging
 from typing import TYPE_CHECKING
 
-from pyrogram.session.internals import DataCenter
+from pyrogram.session.internals import DataCenter, DcOptions
 
-from .transport import TCP, TCPAbridged
+from .proxy_pool import ProxyPool
+from .transport import TCP, SocketOptions, TCPAbridged
 
 if TYPE_CHECKING:
     from .transport.tcp.tcp import Proxy
@@ -34,15 +35,19 @@ log = logging.getLogger(__name__)
 
 class Connection:
     MAX_CONNECTION_ATTEMPTS = 3
+    # Seconds to wait for an address to connect before racing the next one along with it (RFC 8305)
+    CONNECTION_ATTEMPT_DELAY = 0.25
 
     def __init__(
         self,
         dc_id: int,
         test_mode: bool,
         ipv6: bool,
-        proxy: Proxy,
+        proxy: Proxy | ProxyPool,
         media: bool = False,
         protocol_factory: type[TCP] = TCPAbridged,
+        socket_options: SocketOptions | None = None,
+        dc_options: DcOptions | None = None,
     ) -> None:
         self.dc_id = dc_id
         self.test_mode = test_mode
@@ -50,40 +55,122 @@ class Connection:
         self.proxy = proxy
         self.media = media
         self.protocol_factory = protocol_factory
+        self.socket_options = socket_options
+        self.dc_options = dc_options or DcOptions()
 
-        self.address = DataCenter(dc_id, test_mode, ipv6, media)
+        self.address: tuple[str, int] | None = None
         self.protocol: TCP | None = None
+        # The proxy picked from the pool for the current connection
+        self.pool_proxy: Proxy | None = None
+
+    async def race(self, proxy: Proxy | None) -> None:
+        """Connect to the first address of the DC that answers.
+
+        Addresses are tried best first. Each one gets a head start of CONNECTION_ATTEMPT_DELAY seconds (or until it
+        fails) before the next one is tried along with it, and the first connection made wins.
+        """
+        loop = asyncio.get_running_loop()
+        addresses = iter(
+            self.dc_options.get(self.dc_id, self.test_mode, self.ipv6, self.media, proxied=proxy is not None)
+        )
+        attempts: dict[asyncio.Task, tuple[TCP, tuple[str, int], float]] = {}
+        error: BaseException | None = None
+        next_address = next(addresses, None)
+
+        try:
+            while next_address is not None or attempts:
+                if next_address is not None:
+                    # Each address is connected to with its own family, IPv4 ones included when ipv6 is set
+                    protocol = self.protocol_factory(
+                        ipv6=":" in next_address[0], proxy=proxy, socket_options=self.socket_options
+                    )
+                    task = loop.create_task(protocol.connect(next_address))
+                    attempts[task] = protocol, next_address, loop.time()
+                    next_address = next(addresses, None)
+
+                done, _ = await asyncio.wait(
+                    attempts,
+                    timeout=None if next_address is None else self.CONNECTION_ATTEMPT_DELAY,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+
+                for task in done:
+                    protocol, address, started_at = attempts.pop(task)
+                    e = task.exception()
+
+                    if e is None and self.address is None:
+                        self.protocol, self.address = protocol, address
+                        self.dc_options.report(address, loop.time() - started_at)
+                        continue
+
+                    await protocol.close()
+
+                    if e is not None:
+                        if not isinstance(e, OSError):
+                            raise e
+
+                        log.info("Unable to connect to %s:%s: %s", *address, e)
+                        self.dc_options.report(address, None)
+                        error = e
+
+                if self.address is not None:
+                    return
+        finally:
+            for task, (protocol, _, _) in attempts.items():
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+                await protocol.close()
+
+        raise error or ConnectionError("No address to connect to")
 
     async def connect(self) -> None:
         for i in range(Connection.MAX_CONNECTION_ATTEMPTS):
-            self.protocol = self.protocol_factory(ipv6=self.ipv6, proxy=self.proxy)
+            if isinstance(self.proxy, ProxyPool):
+                proxy = self.pool_proxy = self.proxy.acquire(
+                    DataCenter(self.dc_id, self.test_mode, self.ipv6, self.media)
+                )
+            else:
+                proxy = self.proxy
+
+            self.protocol = self.address = None
 
             try:
                 log.info("Connecting...")
-                await self.protocol.connect(self.address)
+                await self.race(proxy)
             except OSError as e:
                 log.warning("Unable to connect due to network issues: %s", e)
-                await self.protocol.close()
+                self.release_proxy(failed=True)
                 await asyncio.sleep(1)
+            except BaseException:
+                self.release_proxy()
+                raise
             else:
                 log.info(
                     "Connected! %s DC%s%s - IPv%s",
                     "Test" if self.test_mode else "Production",
                     self.dc_id,
                     " (media)" if self.media else "",
-                    "6" if self.ipv6 else "4",
+                    "6" if ":" in self.address[0] else "4",
                 )
                 break
         else:
             log.warning("Connection failed! Trying again...")
             raise ConnectionError
 
+    def release_proxy(self, failed: bool = False) -> None:
+        if self.pool_proxy is not None:
+            self.proxy.release(self.pool_proxy, failed=failed)
+            self.pool_proxy = None
+
     async def close(self) -> None:
-        await self.protocol.close()
+        if self.protocol is not None:
+            await self.protocol.close()
+
+        self.release_proxy()
         log.info("Disconnected")
 
     async def send(self, data: bytes) -> None:
         await self.protocol.send(data)
 
-    async def recv(self) -> bytes | None:
+    async def recv(self) -> memoryview | None:
         return await self.protocol.recv()
@@ -0,0 +1,211 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+
+from .transport.tcp.proxy import Proxy, open_proxy_socket
+
+log = logging.getLogger(__name__)
+
+
+class ProxyState:
+    __slots__ = ("proxy", "in_use", "failures", "cooldown", "down_until", "address")
+
+    def __init__(self, proxy: Proxy) -> None:
+        self.proxy = proxy
+        self.in_use = 0
+        self.failures = 0
+        self.cooldown = 0.0
+        self.down_until: float | None = None
+        # Address of the DC last connected to through the proxy, which health checks connect to
+        self.address: tuple[str, int] | None = None
+
+    @property
+    def is_up(self) -> bool:
+        return self.down_until is None
+
+
+class ProxyPool:
+    """Spread connections across a list of proxies, taking the failing ones out of rotation.
+
+    Pass a pool as the *proxy* of one or more clients. Each connection is made through the working proxy with the
+    fewest connections. A proxy failing *max_failures* connections in a row is taken out of rotation, and a health
+    check tries to connect through it again once its cooldown has passed; the cooldown doubles after each failed
+    check, up to *max_cooldown*. When no proxy is working, the one due back the soonest is used.
+
+    Parameters:
+        proxies (List of ``dict``):
+            The proxies, in the same format as the *proxy* of a :obj:`~pyrogram.Client`.
+
+        max_failures (``int``, *optional*):
+            Consecutive failed connections after which a proxy is taken out of rotation.
+            Defaults to 2.
+
+        cooldown (``float``, *optional*):
+            Seconds to wait before checking a proxy taken out of rotation.
+            Defaults to 30.
+
+        max_cooldown (``float``, *optional*):
+            Upper bound of the cooldown.
+            Defaults to 600.
+
+        check_address (``tuple``, *optional*):
+            The (host, port) health checks connect to through the proxies.
+            Defaults to the address of the DC the client last connected to through each proxy, which follows the
+            client's test mode and IPv6 settings.
+    """
+
+    CHECK_INTERVAL = 5
+    CHECK_TIMEOUT = 10
+
+    def __init__(
+        self,
+        proxies: list[Proxy],
+        max_failures: int = 2,
+        cooldown: float = 30,
+        max_cooldown: float = 600,
+        check_address: tuple[str, int] = None,
+    ) -> None:
+        if not proxies:
+            raise ValueError("The proxy pool is empty")
+
+        self.states = [ProxyState(proxy) for proxy in proxies]
+        self.max_failures = max_failures
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.check_address = check_address
+
+        self.next_index = 0
+        self.check_task: asyncio.Task | None = None
+
+    def get_state(self, proxy: Proxy) -> ProxyState:
+        for state in self.states:
+            if state.proxy is proxy:
+                return state
+
+        raise ValueError("The proxy doesn't belong to this pool")
+
+    @property
+    def available(self) -> list[Proxy]:
+        return [state.proxy for state in self.states if state.is_up]
+
+    def acquire(self, address: tuple[str, int] = None) -> Proxy:
+        """Pick the proxy for a connection to *address*. Pass it to :meth:`release` once the connection is closed."""
+        # Start from a different proxy each time, so that ties are broken in turns
+        count = len(self.states)
+        states = [self.states[(self.next_index + i) % count] for i in range(count)]
+        self.next_index = (self.next_index + 1) % count
+
+        up = [state for state in states if state.is_up]
+
+        if up:
+            state = min(up, key=lambda s: s.in_use)
+        else:
+            state = min(states, key=lambda s: s.down_until)
+            log.warning("No proxy is working, trying %s:%s", state.proxy.get("hostname"), state.proxy.get("port"))
+
+        state.in_use += 1
+
+        if address is not None:
+            state.address = address
+
+        self.start_checks()
+
+        return state.proxy
+
+    def release(self, proxy: Proxy, failed: bool = False) -> None:
+        """Give back a proxy, telling whether the connection made through it failed."""
+        state = self.get_state(proxy)
+        state.in_use = max(state.in_use - 1, 0)
+
+        if failed:
+            self.report_failure(state)
+        else:
+            self.report_success(state)
+
+        if not any(state.in_use for state in self.states):
+            self.stop_checks()
+
+    def report_success(self, state: ProxyState) -> None:
+        if not state.is_up:
+            log.info("Proxy %s:%s is back in rotation", state.proxy.get("hostname"), state.proxy.get("port"))
+
+        state.failures = 0
+        state.cooldown = 0.0
+        state.down_until = None
+
+    def report_failure(self, state: ProxyState) -> None:
+        state.failures += 1
+
+        if state.is_up and state.failures < self.max_failures:
+            return
+
+        if state.is_up:
+            log.warning("Proxy %s:%s taken out of rotation", state.proxy.get("hostname"), state.proxy.get("port"))
+
+        state.cooldown = min(state.cooldown * 2 or self.base_cooldown, self.max_cooldown)
+        state.down_until = time.monotonic() + state.cooldown
+
+        self.start_checks()
+
+    async def check(self, proxy: Proxy) -> bool:
+        """Try to connect to the check address through a proxy, and put it back into rotation if it works."""
+        state = self.get_state(proxy)
+        address = self.check_address or state.address
+
+        if address is None:
+            raise ValueError("No address to check the proxy with, pass check_address to the pool")
+
+        try:
+            sock = await asyncio.wait_for(open_proxy_socket(proxy, address), self.CHECK_TIMEOUT)
+        except (OSError, asyncio.TimeoutError) as e:
+            log.info("Proxy check failed: %s %s", type(e).__name__, e)
+            self.report_failure(state)
+            return False
+
+        sock.close()
+        self.report_success(state)
+
+        return True
+
+    async def check_worker(self) -> None:
+        try:
+            while not all(state.is_up for state in self.states):
+                now = time.monotonic()
+                due = [state.proxy for state in self.states if not state.is_up and state.down_until <= now]
+
+                if due:
+                    await asyncio.gather(*(self.check(proxy) for proxy in due))
+
+                await asyncio.sleep(self.CHECK_INTERVAL)
+        finally:
+            if self.check_task is asyncio.current_task():
+                self.check_task = None
+
+    def start_checks(self) -> None:
+        if self.check_task is None and not all(state.is_up for state in self.states):
+            self.check_task = asyncio.get_running_loop().create_task(self.check_worker())
+
+    def stop_checks(self) -> None:
+        if self.check_task is not None:
+            self.check_task.cancel()
+            self.check_task = None
@@ -16,10 +16,19 @@
 #  You should have received a copy of the GNU Lesser General Public License
 #  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
-from .tcp import TCP, TCPAbridged, TCPAbridgedO, TCPFull, TCPIntermediate, TCPIntermediateO
+from .tcp import (
+    TCP,
+    SocketOptions,
+    TCPAbridged,
+    TCPAbridgedO,
+    TCPFull,
+    TCPIntermediate,
+    TCPIntermediateO,
+)
 
 __all__ = [
     "TCP",
+    "SocketOptions",
     "TCPAbridged",
     "TCPAbridgedO",
     "TCPFull",
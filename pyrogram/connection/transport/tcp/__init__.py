@@ -16,6 +16,8 @@
 #  You should have received a copy of the GNU Lesser General Public License
 #  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
+from .proxy import ProxyError
+from .socket_options import SocketOptions
 from .tcp import TCP, Proxy
 from .tcp_abridged import TCPAbridged
 from .tcp_abridged_o import TCPAbridgedO
@@ -26,6 +28,8 @@ from .tcp_intermediate_o import TCPIntermediateO
 __all__ = [
     "TCP",
     "Proxy",
+    "ProxyError",
+    "SocketOptions",
     "TCPAbridged",
     "TCPAbridgedO",
     "TCPFull",
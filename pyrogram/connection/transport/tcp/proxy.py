@@ -0,0 +1,273 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import annotations
+
+import asyncio
+import ipaddress
+import socket
+from base64 import b64encode
+from struct import pack
+from typing import Awaitable, Callable, TypedDict
+
+from .socket_options import SocketOptions
+
+
+class Proxy(TypedDict):
+    scheme: str
+    hostname: str
+    port: int
+    username: str | None
+    password: str | None
+
+
+class ProxyError(ConnectionError):
+    pass
+
+
+# The proxy reply is read before the client sends anything through the tunnel, so a reply is never followed by data
+MAX_HTTP_REPLY_SIZE = 16 * 1024
+
+SOCKS5_ERRORS = {
+    0x01: "General SOCKS server failure",
+    0x02: "Connection not allowed by ruleset",
+    0x03: "Network unreachable",
+    0x04: "Host unreachable",
+    0x05: "Connection refused",
+    0x06: "TTL expired",
+    0x07: "Command not supported",
+    0x08: "Address type not supported",
+}
+
+
+async def recv_exactly(loop: asyncio.AbstractEventLoop, sock: socket.socket, size: int) -> bytes:
+    data = b""
+
+    while len(data) < size:
+        chunk = await loop.sock_recv(sock, size - len(data))
+
+        if not chunk:
+            raise ProxyError("Proxy closed the connection")
+
+        data += chunk
+
+    return data
+
+
+def pack_address(host: str) -> tuple[int, bytes]:
+    """Return the SOCKS5 address type and the packed address of a host."""
+    try:
+        ip_address = ipaddress.ip_address(host)
+    except ValueError:
+        name = host.encode("idna")
+        return 0x03, bytes([len(name)]) + name
+    else:
+        return (0x04 if ip_address.version == 6 else 0x01), ip_address.packed
+
+
+async def socks4_handshake(
+    loop: asyncio.AbstractEventLoop,
+    sock: socket.socket,
+    destination: tuple[str, int],
+    username: str | None,
+    password: str | None,
+) -> None:
+    host, port = destination
+
+    try:
+        ip_address = ipaddress.ip_address(host)
+    except ValueError:
+        # SOCKS4a: an invalid IP tells the proxy to resolve the name that follows the user id
+        address, name = b"\x00\x00\x00\x01", host.encode("idna") + b"\x00"
+    else:
+        if ip_address.version == 6:
+            raise ProxyError("SOCKS4 proxies don't support IPv6 destinations")
+
+        address, name = ip_address.packed, b""
+
+    user_id = (username or "").encode()
+
+    await loop.sock_sendall(sock, b"\x04\x01" + pack(">H", port) + address + user_id + b"\x00" + name)
+
+    version, status = (await recv_exactly(loop, sock, 8))[:2]
+
+    if version != 0x00:
+        raise ProxyError("Invalid SOCKS4 proxy reply")
+
+    if status != 0x5A:
+        raise ProxyError(f"SOCKS4 proxy rejected the connection ({status:#x})")
+
+
+async def socks5_handshake(
+    loop: asyncio.AbstractEventLoop,
+    sock: socket.socket,
+    destination: tuple[str, int],
+    username: str | None,
+    password: str | None,
+) -> None:
+    host, port = destination
+
+    # No authentication, plus username/password authentication if credentials were given
+    methods = b"\x00\x02" if username else b"\x00"
+
+    await loop.sock_sendall(sock, b"\x05" + bytes([len(methods)]) + methods)
+
+    version, method = await recv_exactly(loop, sock, 2)
+
+    if version != 0x05:
+        raise ProxyError("Invalid SOCKS5 proxy reply")
+
+    if method == 0x02:
+        user, secret = username.encode(), (password or "").encode()
+
+        await loop.sock_sendall(sock, b"\x01" + bytes([len(user)]) + user + bytes([len(secret)]) + secret)
+
+        _, status = await recv_exactly(loop, sock, 2)
+
+        if status != 0x00:
+            raise ProxyError("SOCKS5 proxy authentication failed")
+    elif method != 0x00:
+        raise ProxyError("SOCKS5 proxy requires an unsupported authentication method")
+
+    address_type, address = pack_address(host)
+
+    await loop.sock_sendall(sock, b"\x05\x01\x00" + bytes([address_type]) + address + pack(">H", port))
+
+    version, status, _, address_type = await recv_exactly(loop, sock, 4)
+
+    if version != 0x05:
+        raise ProxyError("Invalid SOCKS5 proxy reply")
+
+    if status != 0x00:
+        raise ProxyError(SOCKS5_ERRORS.get(status, f"SOCKS5 proxy rejected the connection ({status:#x})"))
+
+    # Skip the address the proxy bound to
+    if address_type == 0x01:
+        size = 4
+    elif address_type == 0x04:
+        size = 16
+    elif address_type == 0x03:
+        size = (await recv_exactly(loop, sock, 1))[0]
+    else:
+        raise ProxyError("Invalid SOCKS5 proxy reply")
+
+    await recv_exactly(loop, sock, size + 2)
+
+
+async def http_handshake(
+    loop: asyncio.AbstractEventLoop,
+    sock: socket.socket,
+    destination: tuple[str, int],
+    username: str | None,
+    password: str | None,
+) -> None:
+    host, port = destination
+
+    if ":" in host:
+        host = f"[{host}]"
+
+    request = f"CONNECT {host}:{port} HTTP/1.1\r\nHost: {host}:{port}\r\n"
+
+    if username:
+        credentials = b64encode(f"{username}:{password or ''}".encode()).decode()
+        request += f"Proxy-Authorization: Basic {credentials}\r\n"
+
+    await loop.sock_sendall(sock, (request + "\r\n").encode())
+
+    reply = b""
+
+    while b"\r\n\r\n" not in reply:
+        if len(reply) > MAX_HTTP_REPLY_SIZE:
+            raise ProxyError("HTTP proxy reply is too large")
+
+        chunk = await loop.sock_recv(sock, 4096)
+
+        if not chunk:
+            raise ProxyError("Proxy closed the connection")
+
+        reply += chunk
+
+    status_line = reply.split(b"\r\n", 1)[0].decode("latin-1")
+    parts = status_line.split(" ", 2)
+
+    if len(parts) < 2 or not parts[0].startswith("HTTP/") or not parts[1].isdigit():
+        raise ProxyError("Invalid HTTP proxy reply")
+
+    if parts[1] != "200":
+        raise ProxyError(f"HTTP proxy rejected the connection: {' '.join(parts[1:])}")
+
+
+handshake_by_scheme: dict[str, Callable[..., Awaitable[None]]] = {
+    "SOCKS4": socks4_handshake,
+    "SOCKS5": socks5_handshake,
+    "HTTP": http_handshake,
+}
+
+
+def get_handshake(proxy: Proxy) -> Callable[..., Awaitable[None]]:
+    scheme = proxy.get("scheme")
+    if scheme is None:
+        raise ValueError("No scheme specified")
+
+    handshake = handshake_by_scheme.get(scheme.upper())
+    if handshake is None:
+        raise ValueError(f"Unknown proxy type {scheme}")
+
+    return handshake
+
+
+async def open_proxy_socket(
+    proxy: Proxy,
+    destination: tuple[str, int],
+    socket_options: SocketOptions | None = None,
+) -> socket.socket:
+    """Connect to a proxy and ask it to open a tunnel to *destination*, without blocking the event loop.
+
+    Returns the non-blocking socket, ready to carry the data meant for *destination*.
+    """
+    loop = asyncio.get_running_loop()
+    handshake = get_handshake(proxy)
+
+    hostname = proxy.get("hostname")
+    port = proxy.get("port")
+
+    try:
+        ip_address = ipaddress.ip_address(hostname)
+    except ValueError:
+        is_proxy_ipv6 = False
+    else:
+        is_proxy_ipv6 = isinstance(ip_address, ipaddress.IPv6Address)
+
+    proxy_family = socket.AF_INET6 if is_proxy_ipv6 else socket.AF_INET
+
+    (family, sock_type, proto, _, address), *_ = await loop.getaddrinfo(
+        hostname, port, family=proxy_family, type=socket.SOCK_STREAM
+    )
+    sock = socket.socket(family, sock_type, proto)
+
+    try:
+        sock.setblocking(False)
+        (socket_options or SocketOptions()).apply(sock, is_proxied=True)
+
+        await loop.sock_connect(sock, address)
+        await handshake(loop, sock, destination, proxy.get("username"), proxy.get("password"))
+    except BaseException:
+        sock.close()
+        raise
+
+    return sock
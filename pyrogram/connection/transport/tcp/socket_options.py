@@ -0,0 +1,130 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import annotations
+
+import logging
+import socket
+
+log = logging.getLogger(__name__)
+
+
+class SocketOptions:
+    """Socket level options applied to the connections of a client, before they connect.
+
+    Options not supported by the platform (e.g.: TCP_QUICKACK outside Linux) are skipped.
+
+    Parameters:
+        nodelay (``bool``, *optional*):
+            Disable Nagle's algorithm (TCP_NODELAY), so that small packets are sent without delay.
+            Defaults to True.
+
+        send_buffer (``int``, *optional*):
+            Size of the socket send buffer in bytes (SO_SNDBUF).
+            Defaults to the system default.
+
+        recv_buffer (``int``, *optional*):
+            Size of the socket receive buffer in bytes (SO_RCVBUF).
+            Defaults to the system default.
+
+        keepalive (``bool``, *optional*):
+            Enable TCP keepalive probes (SO_KEEPALIVE).
+            Defaults to False.
+
+        keepalive_idle (``int``, *optional*):
+            Seconds of idleness before the first keepalive probe (TCP_KEEPIDLE).
+
+        keepalive_interval (``int``, *optional*):
+            Seconds between keepalive probes (TCP_KEEPINTVL).
+
+        keepalive_count (``int``, *optional*):
+            Unanswered probes before the connection is dropped (TCP_KEEPCNT).
+
+        quickack (``bool``, *optional*):
+            Send ACKs straight away instead of delaying them (TCP_QUICKACK, Linux only). The kernel may turn it
+            off again later on.
+            Defaults to False.
+
+        fast_open (``bool``, *optional*):
+            Send the first data along with the connection handshake (TCP_FASTOPEN_CONNECT, Linux only). Only applies
+            to direct connections.
+            Defaults to False.
+
+        source_address (``tuple``, *optional*):
+            Local (host, port) to bind the socket to before connecting, e.g.: ("192.168.1.2", 0).
+    """
+
+    def __init__(
+        self,
+        nodelay: bool = True,
+        send_buffer: int = None,
+        recv_buffer: int = None,
+        keepalive: bool = False,
+        keepalive_idle: int = None,
+        keepalive_interval: int = None,
+        keepalive_count: int = None,
+        quickack: bool = False,
+        fast_open: bool = False,
+        source_address: tuple[str, int] = None,
+    ):
+        self.nodelay = nodelay
+        self.send_buffer = send_buffer
+        self.recv_buffer = recv_buffer
+        self.keepalive = keepalive
+        self.keepalive_idle = keepalive_idle
+        self.keepalive_interval = keepalive_interval
+        self.keepalive_count = keepalive_count
+        self.quickack = quickack
+        self.fast_open = fast_open
+        self.source_address = source_address
+
+    def apply(self, sock: socket.socket, is_proxied: bool = False) -> None:
+        options = [
+            (socket.IPPROTO_TCP, "TCP_NODELAY", int(self.nodelay)),
+            (socket.SOL_SOCKET, "SO_SNDBUF", self.send_buffer),
+            (socket.SOL_SOCKET, "SO_RCVBUF", self.recv_buffer),
+            (socket.SOL_SOCKET, "SO_KEEPALIVE", int(self.keepalive)),
+        ]
+
+        if self.keepalive:
+            options += [
+                (socket.IPPROTO_TCP, "TCP_KEEPIDLE", self.keepalive_idle),
+                (socket.IPPROTO_TCP, "TCP_KEEPINTVL", self.keepalive_interval),
+                (socket.IPPROTO_TCP, "TCP_KEEPCNT", self.keepalive_count),
+            ]
+
+        if self.quickack:
+            options.append((socket.IPPROTO_TCP, "TCP_QUICKACK", 1))
+
+        # Proxies speak first, which fast open would get in the way of
+        if self.fast_open and not is_proxied:
+            options.append((socket.IPPROTO_TCP, "TCP_FASTOPEN_CONNECT", 1))
+
+        for level, name, value in options:
+            option = getattr(socket, name, None)
+
+            if value is None or option is None:
+                continue
+
+            try:
+                sock.setsockopt(level, option, value)
+            except OSError as e:
+                log.warning("Unable to set %s: %s", name, e)
+
+        if self.source_address is not None:
+            sock.bind(self.source_address)
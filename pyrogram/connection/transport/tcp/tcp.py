@@ -19,90 +19,235 @@
 from __future__ import annotations
 
 import asyncio
-import ipaddress
 import logging
 import socket
-from typing import TypedDict
+from collections import deque
 
-import socks
+from .proxy import Proxy, open_proxy_socket
+from .socket_options import SocketOptions
 
 log = logging.getLogger(__name__)
 
-proxy_type_by_scheme: dict[str, int] = {
-    "SOCKS4": socks.SOCKS4,
-    "SOCKS5": socks.SOCKS5,
-    "HTTP": socks.HTTP,
-}
 
+class TCPProtocol(asyncio.BufferedProtocol):
+    """Receive the frames of a :obj:`TCP` transport straight out of a reusable buffer.
 
-class Proxy(TypedDict):
-    scheme: str
-    hostname: str
-    port: int
-    username: str | None
-    password: str | None
+    Bytes are received into a fixed buffer and complete frames are copied out of it once, into a buffer of their own.
+    Large frames skip the receive buffer altogether: once their header is known, the rest of their bytes are received
+    directly into the frame buffer. Frames are handed out as memoryviews, in order.
+    """
+
+    BUFFER_SIZE = 64 * 1024
+    # Frames at least this large are received directly into a buffer of their own
+    DIRECT_THRESHOLD = 16 * 1024
+    # Reading pauses while this many frames are waiting to be received
+    MAX_PENDING_FRAMES = 64
+
+    def __init__(self, tcp: TCP) -> None:
+        self.tcp = tcp
+        self.transport: asyncio.Transport | None = None
+
+        self.buffer = bytearray(self.BUFFER_SIZE)
+        self.view = memoryview(self.buffer)
+        self.start = 0
+        self.end = 0
+
+        # The large frame being received, if any, and how much of it has arrived
+        self.frame: memoryview | None = None
+        self.filled = 0
+
+        self.frames = deque()
+        self.waiter: asyncio.Future | None = None
+
+        self.is_paused = False
+        self.is_reading_paused = False
+        self.drain_waiters: list[asyncio.Future] = []
+
+        self.closed = False
+
+    def connection_made(self, transport: asyncio.Transport) -> None:
+        self.transport = transport
+
+    def connection_lost(self, exc: Exception | None) -> None:
+        self.closed = True
+        self.wake_up()
+
+        for waiter in self.drain_waiters:
+            if not waiter.done():
+                waiter.set_exception(ConnectionResetError("Connection lost") if exc is None else exc)
+
+        self.drain_waiters.clear()
+
+    def get_buffer(self, sizehint: int) -> memoryview:
+        if self.frame is not None:
+            return self.frame[self.filled:]
+
+        # The unparsed bytes left are less than a small frame, moving them back makes room for the next ones
+        if len(self.buffer) - self.end < self.DIRECT_THRESHOLD:
+            size = self.end - self.start
+            self.buffer[:size] = self.view[self.start:self.end]
+            self.start, self.end = 0, size
+
+        return self.view[self.end:]
+
+    def buffer_updated(self, nbytes: int) -> None:
+        if self.frame is not None:
+            self.tcp.received(self.frame[self.filled:self.filled + nbytes])
+            self.filled += nbytes
+
+            if self.filled == len(self.frame):
+                frame, self.frame = self.frame, None
+                self.put(frame)
+
+            return
+
+        self.tcp.received(self.view[self.end:self.end + nbytes])
+        self.end += nbytes
+
+        self.parse()
+
+    def parse(self) -> None:
+        while self.start < self.end:
+            available = self.view[self.start:self.end]
+            header = self.tcp.parse_header(available)
+
+            if header is None:
+                break
+
+            header_size, frame_size = header
+
+            # An empty frame with no header would never move the parser forward
+            if (
+                frame_size < self.tcp.MIN_FRAME_SIZE
+                or frame_size > self.tcp.MAX_FRAME_SIZE
+                or header_size + frame_size == 0
+            ):
+                log.warning("Invalid frame size: %s", frame_size)
+                self.transport.close()
+                return
+
+            if len(available) >= header_size + frame_size:
+                self.put(memoryview(bytearray(available[header_size:header_size + frame_size])))
+                self.start += header_size + frame_size
+            elif frame_size >= self.DIRECT_THRESHOLD:
+                self.frame = memoryview(bytearray(frame_size))
+                self.filled = len(available) - header_size
+                self.frame[:self.filled] = available[header_size:]
+                self.start = self.end
+            else:
+                break
+
+        if self.start == self.end:
+            self.start = self.end = 0
+
+    def put(self, frame: memoryview) -> None:
+        self.frames.append(self.tcp.decode_frame(frame))
+        self.wake_up()
+
+        if len(self.frames) >= self.MAX_PENDING_FRAMES and not self.is_reading_paused:
+            self.is_reading_paused = True
+            self.transport.pause_reading()
+
+    def wake_up(self) -> None:
+        if self.waiter is not None and not self.waiter.done():
+            self.waiter.set_result(None)
+
+    async def recv(self) -> memoryview | None:
+        while not self.frames:
+            if self.closed:
+                return None
+
+            self.waiter = asyncio.get_running_loop().create_future()
+            await self.waiter
+
+        if self.is_reading_paused and len(self.frames) < self.MAX_PENDING_FRAMES // 2:
+            self.is_reading_paused = False
+            self.transport.resume_reading()
+
+        return self.frames.popleft()
+
+    def pause_writing(self) -> None:
+        self.is_paused = True
+
+    def resume_writing(self) -> None:
+        self.is_paused = False
+
+        for waiter in self.drain_waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+        self.drain_waiters.clear()
+
+    async def drain(self) -> None:
+        if self.closed:
+            raise ConnectionResetError("Connection lost")
+
+        if self.is_paused:
+            waiter = asyncio.get_running_loop().create_future()
+            self.drain_waiters.append(waiter)
+            await waiter
 
 
 class TCP:
     TIMEOUT = 10
-
-    def __init__(self, ipv6: bool, proxy: Proxy) -> None:
+    MIN_FRAME_SIZE = 0
+    MAX_FRAME_SIZE = 64 * 1024 * 1024
+    # Frames sent are queued and written together after FLUSH_DELAY seconds: 0 coalesces the frames sent during the
+    # same event loop iteration, None writes every frame straight away
+    FLUSH_DELAY = 0
+    # Senders only wait for the socket once this many bytes are waiting to be written
+    WRITE_BUFFER_HIGH_WATER = 256 * 1024
+
+    def __init__(self, ipv6: bool, proxy: Proxy, socket_options: SocketOptions | None = None) -> None:
         self.ipv6 = ipv6
         self.proxy = proxy
+        self.socket_options = socket_options or SocketOptions()
 
-        self.reader: asyncio.StreamReader | None = None
-        self.writer: asyncio.StreamWriter | None = None
+        self.transport: asyncio.Transport | None = None
+        self.protocol: TCPProtocol | None = None
+
+        self.write_queue: list[bytes] = []
+        # Total bytes sent over the connection, so that callers can tell how much may still be in flight
+        self.bytes_sent = 0
+        self.flush_handle: asyncio.Handle | None = None
 
-        self.lock = asyncio.Lock()
         self.loop = asyncio.get_running_loop()
         self._closed = True
 
     @property
     def closed(self) -> bool:
         return (
-            self._closed or self.writer is None or self.writer.is_closing() or self.reader is None
+            self._closed or self.transport is None or self.transport.is_closing() or self.protocol.closed
         )
 
     async def _connect_via_proxy(self, destination: tuple[str, int]) -> None:
-        scheme = self.proxy.get("scheme")
-        if scheme is None:
-            raise ValueError("No scheme specified")
-
-        proxy_type = proxy_type_by_scheme.get(scheme.upper())
-        if proxy_type is None:
-            raise ValueError(f"Unknown proxy type {scheme}")
-
-        hostname = self.proxy.get("hostname")
-        port = self.proxy.get("port")
-        username = self.proxy.get("username")
-        password = self.proxy.get("password")
-
-        try:
-            ip_address = ipaddress.ip_address(hostname)
-        except ValueError:
-            is_proxy_ipv6 = False
-        else:
-            is_proxy_ipv6 = isinstance(ip_address, ipaddress.IPv6Address)
+        sock = await open_proxy_socket(self.proxy, destination, self.socket_options)
 
-        proxy_family = socket.AF_INET6 if is_proxy_ipv6 else socket.AF_INET
-        sock = socks.socksocket(proxy_family)
-
-        sock.set_proxy(
-            proxy_type=proxy_type, addr=hostname, port=port, username=username, password=password
+        self.transport, self.protocol = await self.loop.create_connection(
+            lambda: TCPProtocol(self), sock=sock
         )
-        sock.settimeout(TCP.TIMEOUT)
-
-        await self.loop.sock_connect(sock=sock, address=destination)
-
-        sock.setblocking(False)
-
-        self.reader, self.writer = await asyncio.open_connection(sock=sock)
 
     async def _connect_via_direct(self, destination: tuple[str, int]) -> None:
         host, port = destination
         family = socket.AF_INET6 if self.ipv6 else socket.AF_INET
-        self.reader, self.writer = await asyncio.open_connection(
-            host=host, port=port, family=family
+
+        # The socket is created here rather than by create_connection, so that the options can be set before the
+        # handshake (buffer sizes, fast open and the source address have no effect afterwards)
+        (family, sock_type, proto, _, address), *_ = await self.loop.getaddrinfo(
+            host, port, family=family, type=socket.SOCK_STREAM
+        )
+        sock = socket.socket(family, sock_type, proto)
+
+        try:
+            sock.setblocking(False)
+            self.socket_options.apply(sock)
+            await self.loop.sock_connect(sock, address)
+        except BaseException:
+            sock.close()
+            raise
+
+        self.transport, self.protocol = await self.loop.create_connection(
+            lambda: TCPProtocol(self), sock=sock
         )
 
     async def _connect(self, destination: tuple[str, int]) -> None:
@@ -114,6 +259,7 @@ class TCP:
     async def connect(self, address: tuple[str, int]) -> None:
         try:
             await asyncio.wait_for(self._connect(address), TCP.TIMEOUT)
+            self.transport.set_write_buffer_limits(high=self.WRITE_BUFFER_HIGH_WATER)
             self._closed = False
         except (
             asyncio.TimeoutError
@@ -122,48 +268,80 @@ class TCP:
             raise TimeoutError("Connection timed out")
 
     async def close(self) -> None:
-        if self.writer is None:
+        if self.transport is None:
             self._closed = True
             return
 
         try:
-            self.writer.close()
-            await asyncio.wait_for(self.writer.wait_closed(), TCP.TIMEOUT)
+            self.flush()
+            self.transport.close()
         except Exception as e:
             log.info("Close exception: %s %s", type(e).__name__, e)
         finally:
             self._closed = True
 
-    async def send(self, data: bytes) -> None:
-        if self.writer is None or self._closed:
+    async def send(self, *data: bytes) -> None:
+        """Send a frame made of one or more parts, which are written as they are, without joining them."""
+        if self.transport is None or self._closed or self.protocol.closed:
             raise OSError("Connection is closed")
 
-        async with self.lock:
+        # Parts are queued synchronously, so frames sent concurrently never interleave
+        self.write_queue.extend(data)
+        self.bytes_sent += sum(map(len, data))
+
+        if self.FLUSH_DELAY is None:
+            self.flush()
+        elif self.flush_handle is None:
+            self.flush_handle = (
+                self.loop.call_soon(self.flush)
+                if self.FLUSH_DELAY == 0
+                else self.loop.call_later(self.FLUSH_DELAY, self.flush)
+            )
+
+        if self.protocol.is_paused:
+            self.flush()
+
             try:
-                self.writer.write(data)
-                await self.writer.drain()
+                await self.protocol.drain()
             except Exception as e:
                 log.info("Send exception: %s %s", type(e).__name__, e)
                 self._closed = True
                 raise OSError(e) from e
 
-    async def recv(self, length: int = 0) -> bytes | None:
-        if self._closed or self.reader is None:
+    def flush(self) -> None:
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+
+        if not self.write_queue:
+            return
+
+        queue, self.write_queue = self.write_queue, []
+
+        if not self.transport.is_closing():
+            # Scatter-gather write of every part queued
+            self.transport.writelines(queue)
+
+    async def recv(self) -> memoryview | None:
+        """Receive the next frame, or None once the connection is closed."""
+        if self._closed or self.protocol is None:
             return None
 
-        data = b""
+        # Reads wait for as long as it takes: dead connections are detected by the session, from its pings
+        frame = await self.protocol.recv()
 
-        while len(data) < length:
-            try:
-                chunk = await asyncio.wait_for(self.reader.read(length - len(data)), TCP.TIMEOUT)
-            except (OSError, asyncio.TimeoutError):
-                self._closed = True
-                return None
-            else:
-                if chunk:
-                    data += chunk
-                else:
-                    self._closed = True
-                    return None
+        if frame is None:
+            self._closed = True
+
+        return frame
+
+    def received(self, data: memoryview) -> None:
+        """Process received bytes in place, before they are parsed (e.g.: to decrypt them)."""
+
+    def parse_header(self, data: memoryview) -> tuple[int, int] | None:
+        """Get the header size and the frame size of the next frame, or None if its header is not complete yet."""
+        raise NotImplementedError
 
-        return data
+    def decode_frame(self, frame: memoryview) -> memoryview | None:
+        """Get the packet out of a complete frame, or None if the frame is invalid."""
+        return frame
@@ -20,14 +20,17 @@ from __future__ import annotations
 
 import logging
 
+from .socket_options import SocketOptions
 from .tcp import TCP, Proxy
 
 log = logging.getLogger(__name__)
 
 
 class TCPAbridged(TCP):
-    def __init__(self, ipv6: bool, proxy: Proxy) -> None:
-        super().__init__(ipv6, proxy)
+    def __init__(
+        self, ipv6: bool, proxy: Proxy, socket_options: SocketOptions | None = None
+    ) -> None:
+        super().__init__(ipv6, proxy, socket_options)
 
     async def connect(self, address: tuple[str, int]) -> None:
         await super().connect(address)
@@ -37,19 +40,18 @@ class TCPAbridged(TCP):
         length = len(data) // 4
 
         await super().send(
-            (bytes([length]) if length <= 126 else b"\x7f" + length.to_bytes(3, "little")) + data
+            bytes([length]) if length <= 126 else b"\x7f" + length.to_bytes(3, "little"),
+            data
         )
 
-    async def recv(self, length: int = 0) -> bytes | None:
-        length = await super().recv(1)
-
-        if length is None:
+    def parse_header(self, data: memoryview) -> tuple[int, int] | None:
+        if not data:
             return None
 
-        if length == b"\x7f":
-            length = await super().recv(3)
+        if data[0] != 0x7F:
+            return 1, data[0] * 4
 
-            if length is None:
-                return None
+        if len(data) < 4:
+            return None
 
-        return await super().recv(int.from_bytes(length, "little") * 4)
+        return 4, int.from_bytes(data[1:4], "little") * 4
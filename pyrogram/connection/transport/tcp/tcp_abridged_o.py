@@ -18,13 +18,15 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import os
 
-import pyrogram
-from pyrogram.crypto import aes
+from pyrogram.crypto import aes, executor
 
+from .socket_options import SocketOptions
 from .tcp import TCP, Proxy
+from .tcp_abridged import TCPAbridged
 
 log = logging.getLogger(__name__)
 
@@ -32,12 +34,16 @@ log = logging.getLogger(__name__)
 class TCPAbridgedO(TCP):
     RESERVED = (b"HEAD", b"POST", b"GET ", b"OPTI", b"\xee" * 4)
 
-    def __init__(self, ipv6: bool, proxy: Proxy) -> None:
-        super().__init__(ipv6, proxy)
+    def __init__(
+        self, ipv6: bool, proxy: Proxy, socket_options: SocketOptions | None = None
+    ) -> None:
+        super().__init__(ipv6, proxy, socket_options)
 
         self.encrypt = None
         self.decrypt = None
 
+        self.encrypt_lock = asyncio.Lock()
+
     async def connect(self, address: tuple[str, int]) -> None:
         await super().connect(address)
 
@@ -63,36 +69,18 @@ class TCPAbridgedO(TCP):
 
     async def send(self, data: bytes, *args) -> None:
         length = len(data) // 4
-        data = (
-            bytes([length]) if length <= 126 else b"\x7f" + length.to_bytes(3, "little")
-        ) + data
-        payload = await self.loop.run_in_executor(
-            pyrogram.crypto_executor, aes.ctr256_encrypt, data, *self.encrypt
-        )
-
-        await super().send(payload)
-
-    async def recv(self, length: int = 0) -> bytes | None:
-        length = await super().recv(1)
-
-        if length is None:
-            return None
-
-        length = aes.ctr256_decrypt(length, *self.decrypt)
-
-        if length == b"\x7f":
-            length = await super().recv(3)
-
-            if length is None:
-                return None
+        length = bytes([length]) if length <= 126 else b"\x7f" + length.to_bytes(3, "little")
 
-            length = aes.ctr256_decrypt(length, *self.decrypt)
+        # The AES-CTR state must advance in the same order packets are written. The length and the payload are
+        # encrypted one after the other, the state carrying over
+        async with self.encrypt_lock:
+            length = aes.ctr256_encrypt(length, *self.encrypt)
+            payload = await executor.run(aes.ctr256_encrypt, data, *self.encrypt, size=len(data), stateful=True)
 
-        data = await super().recv(int.from_bytes(length, "little") * 4)
+            await super().send(length, payload)
 
-        if data is None:
-            return None
+    def received(self, data: memoryview) -> None:
+        # The stream is decrypted in place as it arrives, frames are then parsed as in the abridged transport
+        data[:] = aes.ctr256_decrypt(data, *self.decrypt)
 
-        return await self.loop.run_in_executor(
-            pyrogram.crypto_executor, aes.ctr256_decrypt, data, *self.decrypt
-        )
+    parse_header = TCPAbridged.parse_header
@@ -20,16 +20,22 @@ from __future__ import annotations
 
 import logging
 from binascii import crc32
-from struct import pack, unpack
+from struct import pack, unpack_from
 
+from .socket_options import SocketOptions
 from .tcp import TCP, Proxy
 
 log = logging.getLogger(__name__)
 
 
 class TCPFull(TCP):
-    def __init__(self, ipv6: bool, proxy: Proxy) -> None:
-        super().__init__(ipv6, proxy)
+    # Length (4) + seq_no (4) + checksum (4)
+    MIN_FRAME_SIZE = 12
+
+    def __init__(
+        self, ipv6: bool, proxy: Proxy, socket_options: SocketOptions | None = None
+    ) -> None:
+        super().__init__(ipv6, proxy, socket_options)
 
         self.seq_no: int | None = None
 
@@ -38,25 +44,18 @@ class TCPFull(TCP):
         self.seq_no = 0
 
     async def send(self, data: bytes, *args) -> None:
-        data = pack("<II", len(data) + 12, self.seq_no) + data
-        data += pack("<I", crc32(data))
+        header = pack("<II", len(data) + 12, self.seq_no)
         self.seq_no += 1
 
-        await super().send(data)
+        await super().send(header, data, pack("<I", crc32(data, crc32(header))))
 
-    async def recv(self, length: int = 0) -> bytes | None:
-        length = await super().recv(4)
+    def parse_header(self, data: memoryview) -> tuple[int, int] | None:
+        # The length counts the whole frame, itself included
+        return None if len(data) < 4 else (0, unpack_from("<I", data)[0])
 
-        if length is None:
+    def decode_frame(self, frame: memoryview) -> memoryview | None:
+        # Length (4) + seq_no (4) + packet + checksum (4)
+        if len(frame) < 12 or crc32(frame[:-4]) != unpack_from("<I", frame, len(frame) - 4)[0]:
             return None
 
-        packet = await super().recv(unpack("<I", length)[0] - 4)
-
-        if packet is None:
-            return None
-
-        packet = length + packet
-        checksum = packet[-4:]
-        packet = packet[:-4]
-
-        return None if crc32(packet) != unpack("<I", checksum)[0] else packet[8:]
+        return frame[8:-4]
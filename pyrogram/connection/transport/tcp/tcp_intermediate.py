@@ -19,25 +19,26 @@
 from __future__ import annotations
 
 import logging
-from struct import pack, unpack
+from struct import pack, unpack_from
 
+from .socket_options import SocketOptions
 from .tcp import TCP, Proxy
 
 log = logging.getLogger(__name__)
 
 
 class TCPIntermediate(TCP):
-    def __init__(self, ipv6: bool, proxy: Proxy) -> None:
-        super().__init__(ipv6, proxy)
+    def __init__(
+        self, ipv6: bool, proxy: Proxy, socket_options: SocketOptions | None = None
+    ) -> None:
+        super().__init__(ipv6, proxy, socket_options)
 
     async def connect(self, address: tuple[str, int]) -> None:
         await super().connect(address)
         await super().send(b"\xee" * 4)
 
     async def send(self, data: bytes, *args) -> None:
-        await super().send(pack("<i", len(data)) + data)
+        await super().send(pack("<i", len(data)), data)
 
-    async def recv(self, length: int = 0) -> bytes | None:
-        length = await super().recv(4)
-
-        return None if length is None else await super().recv(unpack("<i", length)[0])
+    def parse_header(self, data: memoryview) -> tuple[int, int] | None:
+        return None if len(data) < 4 else (4, unpack_from("<i", data)[0])
@@ -18,13 +18,16 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import os
-from struct import pack, unpack
+from struct import pack
 
-from pyrogram.crypto import aes
+from pyrogram.crypto import aes, executor
 
+from .socket_options import SocketOptions
 from .tcp import TCP, Proxy
+from .tcp_intermediate import TCPIntermediate
 
 log = logging.getLogger(__name__)
 
@@ -32,12 +35,16 @@ log = logging.getLogger(__name__)
 class TCPIntermediateO(TCP):
     RESERVED = (b"HEAD", b"POST", b"GET ", b"OPTI", b"\xee" * 4)
 
-    def __init__(self, ipv6: bool, proxy: Proxy) -> None:
-        super().__init__(ipv6, proxy)
+    def __init__(
+        self, ipv6: bool, proxy: Proxy, socket_options: SocketOptions | None = None
+    ) -> None:
+        super().__init__(ipv6, proxy, socket_options)
 
         self.encrypt = None
         self.decrypt = None
 
+        self.encrypt_lock = asyncio.Lock()
+
     async def connect(self, address: tuple[str, int]) -> None:
         await super().connect(address)
 
@@ -62,16 +69,16 @@ class TCPIntermediateO(TCP):
         await super().send(nonce)
 
     async def send(self, data: bytes, *args) -> None:
-        await super().send(aes.ctr256_encrypt(pack("<i", len(data)) + data, *self.encrypt))
-
-    async def recv(self, length: int = 0) -> bytes | None:
-        length = await super().recv(4)
-
-        if length is None:
-            return None
+        # The AES-CTR state must advance in the same order packets are written. The length and the payload are
+        # encrypted one after the other, the state carrying over
+        async with self.encrypt_lock:
+            length = aes.ctr256_encrypt(pack("<i", len(data)), *self.encrypt)
+            payload = await executor.run(aes.ctr256_encrypt, data, *self.encrypt, size=len(data), stateful=True)
 
-        length = aes.ctr256_decrypt(length, *self.decrypt)
+            await super().send(length, payload)
 
-        data = await super().recv(unpack("<i", length)[0])
+    def received(self, data: memoryview) -> None:
+        # The stream is decrypted in place as it arrives, frames are then parsed as in the intermediate transport
+        data[:] = aes.ctr256_decrypt(data, *self.decrypt)
 
-        return None if data is None else aes.ctr256_decrypt(data, *self.decrypt)
+    parse_header = TCPIntermediate.parse_header
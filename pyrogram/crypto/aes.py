@@ -25,6 +25,8 @@ try:
 
     log.info("Using TgCrypto")
 
+    TGCRYPTO_AVAILABLE = True
+
 
     def ige256_encrypt(data: bytes, key: bytes, iv: bytes) -> bytes:
         return tgcrypto.ige256_encrypt(data, key, iv)
@@ -49,14 +51,39 @@ try:
             "big",
         )
 except ImportError:
+    from functools import lru_cache
+    from struct import pack, unpack
+
     import pyaes
 
+    try:
+        import numpy
+    except ImportError:
+        numpy = None
+
     log.warning(
         "TgCrypto is missing! "
         "Pyrogram will work the same, but at a much slower speed. "
         "More info: https://docs.pyrogram.org/topics/speedups"
     )
 
+    TGCRYPTO_AVAILABLE = False
+
+    # Lookup tables for the encryption and decryption rounds, shared with pyaes
+    ENCRYPT_TABLES = (pyaes.AES.T1, pyaes.AES.T2, pyaes.AES.T3, pyaes.AES.T4, pyaes.AES.S)
+    DECRYPT_TABLES = (pyaes.AES.T5, pyaes.AES.T6, pyaes.AES.T7, pyaes.AES.T8, pyaes.AES.Si)
+
+    if numpy is not None:
+        log.info("Using NumPy for AES-CTR")
+
+        NUMPY_ENCRYPT_TABLES = tuple(numpy.array(table, dtype=numpy.uint32) for table in ENCRYPT_TABLES)
+
+    # Below this amount of blocks, the NumPy setup costs more than encrypting the blocks one by one
+    NUMPY_MIN_BLOCKS = 64
+
+    WORD_MASK = 0xFFFFFFFF
+    COUNTER_MASK = (1 << 128) - 1
+
 
     def ige256_encrypt(data: bytes, key: bytes, iv: bytes) -> bytes:
         return ige(data, key, iv, True)
@@ -75,6 +102,9 @@ except ImportError:
 
 
     def xor(a: bytes, b: bytes) -> bytes:
+        if numpy is not None and len(a) >= NUMPY_MIN_BLOCKS * 16:
+            return (numpy.frombuffer(a, numpy.uint8) ^ numpy.frombuffer(b, numpy.uint8)).tobytes()
+
         return int.to_bytes(
             int.from_bytes(a, "big") ^ int.from_bytes(b, "big"),
             len(a),
@@ -82,49 +112,141 @@ except ImportError:
         )
 
 
-    def ige(data: bytes, key: bytes, iv: bytes, encrypt: bool) -> bytes:
+    @lru_cache(maxsize=16)
+    def expand_key(key: bytes) -> tuple:
+        # pyaes keeps its round keys as signed words, the tables below need them unsigned
         cipher = pyaes.AES(key)
 
-        iv_1 = iv[:16]
-        iv_2 = iv[16:]
+        return (
+            [[k & WORD_MASK for k in round_key] for round_key in cipher._Ke],
+            [[k & WORD_MASK for k in round_key] for round_key in cipher._Kd]
+        )
+
+
+    def encrypt_block(round_keys: list, tables: tuple, s0, s1, s2, s3) -> tuple:
+        # Works on single words as well as on NumPy arrays of words (one item per block)
+        t1, t2, t3, t4, sbox = tables
+
+        k = round_keys[0]
+        s0, s1, s2, s3 = s0 ^ k[0], s1 ^ k[1], s2 ^ k[2], s3 ^ k[3]
+
+        for k in round_keys[1:-1]:
+            s0, s1, s2, s3 = (
+                t1[s0 >> 24] ^ t2[s1 >> 16 & 255] ^ t3[s2 >> 8 & 255] ^ t4[s3 & 255] ^ k[0],
+                t1[s1 >> 24] ^ t2[s2 >> 16 & 255] ^ t3[s3 >> 8 & 255] ^ t4[s0 & 255] ^ k[1],
+                t1[s2 >> 24] ^ t2[s3 >> 16 & 255] ^ t3[s0 >> 8 & 255] ^ t4[s1 & 255] ^ k[2],
+                t1[s3 >> 24] ^ t2[s0 >> 16 & 255] ^ t3[s1 >> 8 & 255] ^ t4[s2 & 255] ^ k[3]
+            )
+
+        k = round_keys[-1]
+
+        return (
+            (sbox[s0 >> 24] << 24 | sbox[s1 >> 16 & 255] << 16 | sbox[s2 >> 8 & 255] << 8 | sbox[s3 & 255]) ^ k[0],
+            (sbox[s1 >> 24] << 24 | sbox[s2 >> 16 & 255] << 16 | sbox[s3 >> 8 & 255] << 8 | sbox[s0 & 255]) ^ k[1],
+            (sbox[s2 >> 24] << 24 | sbox[s3 >> 16 & 255] << 16 | sbox[s0 >> 8 & 255] << 8 | sbox[s1 & 255]) ^ k[2],
+            (sbox[s3 >> 24] << 24 | sbox[s0 >> 16 & 255] << 16 | sbox[s1 >> 8 & 255] << 8 | sbox[s2 & 255]) ^ k[3]
+        )
+
 
-        data = [data[i: i + 16] for i in range(0, len(data), 16)]
+    def decrypt_block(round_keys: list, tables: tuple, s0, s1, s2, s3) -> tuple:
+        t5, t6, t7, t8, sbox = tables
+
+        k = round_keys[0]
+        s0, s1, s2, s3 = s0 ^ k[0], s1 ^ k[1], s2 ^ k[2], s3 ^ k[3]
+
+        for k in round_keys[1:-1]:
+            s0, s1, s2, s3 = (
+                t5[s0 >> 24] ^ t6[s3 >> 16 & 255] ^ t7[s2 >> 8 & 255] ^ t8[s1 & 255] ^ k[0],
+                t5[s1 >> 24] ^ t6[s0 >> 16 & 255] ^ t7[s3 >> 8 & 255] ^ t8[s2 & 255] ^ k[1],
+                t5[s2 >> 24] ^ t6[s1 >> 16 & 255] ^ t7[s0 >> 8 & 255] ^ t8[s3 & 255] ^ k[2],
+                t5[s3 >> 24] ^ t6[s2 >> 16 & 255] ^ t7[s1 >> 8 & 255] ^ t8[s0 & 255] ^ k[3]
+            )
+
+        k = round_keys[-1]
+
+        return (
+            (sbox[s0 >> 24] << 24 | sbox[s3 >> 16 & 255] << 16 | sbox[s2 >> 8 & 255] << 8 | sbox[s1 & 255]) ^ k[0],
+            (sbox[s1 >> 24] << 24 | sbox[s0 >> 16 & 255] << 16 | sbox[s3 >> 8 & 255] << 8 | sbox[s2 & 255]) ^ k[1],
+            (sbox[s2 >> 24] << 24 | sbox[s1 >> 16 & 255] << 16 | sbox[s0 >> 8 & 255] << 8 | sbox[s3 & 255]) ^ k[2],
+            (sbox[s3 >> 24] << 24 | sbox[s2 >> 16 & 255] << 16 | sbox[s1 >> 8 & 255] << 8 | sbox[s0 & 255]) ^ k[3]
+        )
+
+
+    def ige(data: bytes, key: bytes, iv: bytes, encrypt: bool) -> bytes:
+        encrypt_keys, decrypt_keys = expand_key(bytes(key))
+
+        words = unpack(f">{len(data) // 4}I", data)
+        out = [0] * len(words)
+
+        a0, a1, a2, a3, b0, b1, b2, b3 = unpack(">8I", iv)
 
         if encrypt:
-            for i, chunk in enumerate(data):
-                iv_1 = data[i] = xor(cipher.encrypt(xor(chunk, iv_1)), iv_2)
-                iv_2 = chunk
+            for i in range(0, len(words), 4):
+                c0, c1, c2, c3 = words[i: i + 4]
+                e0, e1, e2, e3 = encrypt_block(encrypt_keys, ENCRYPT_TABLES, c0 ^ a0, c1 ^ a1, c2 ^ a2, c3 ^ a3)
+
+                out[i: i + 4] = a0, a1, a2, a3 = e0 ^ b0, e1 ^ b1, e2 ^ b2, e3 ^ b3
+                b0, b1, b2, b3 = c0, c1, c2, c3
         else:
-            for i, chunk in enumerate(data):
-                iv_2 = data[i] = xor(cipher.decrypt(xor(chunk, iv_2)), iv_1)
-                iv_1 = chunk
+            for i in range(0, len(words), 4):
+                c0, c1, c2, c3 = words[i: i + 4]
+                d0, d1, d2, d3 = decrypt_block(decrypt_keys, DECRYPT_TABLES, c0 ^ b0, c1 ^ b1, c2 ^ b2, c3 ^ b3)
 
-        return b"".join(data)
+                out[i: i + 4] = b0, b1, b2, b3 = d0 ^ a0, d1 ^ a1, d2 ^ a2, d3 ^ a3
+                a0, a1, a2, a3 = c0, c1, c2, c3
 
+        return pack(f">{len(out)}I", *out)
 
-    def ctr(data: bytes, key: bytes, iv: bytearray, state: bytearray) -> bytes:
-        cipher = pyaes.AES(key)
 
-        out = bytearray(data)
-        chunk = cipher.encrypt(iv)
+    def ctr_keystream(round_keys: list, counter: int, blocks: int) -> bytes:
+        if numpy is not None and blocks >= NUMPY_MIN_BLOCKS:
+            # Encrypt all the counter blocks at once, as 128-bit counters split in two 64-bit halves
+            low = counter & 0xFFFFFFFFFFFFFFFF
+            low_words = numpy.arange(blocks, dtype=numpy.uint64) + numpy.uint64(low)
+            high_words = numpy.full(blocks, counter >> 64, dtype=numpy.uint64) + (low_words < numpy.uint64(low))
+
+            keystream = encrypt_block(
+                round_keys,
+                NUMPY_ENCRYPT_TABLES,
+                (high_words >> numpy.uint64(32)).astype(numpy.uint32),
+                (high_words & numpy.uint64(WORD_MASK)).astype(numpy.uint32),
+                (low_words >> numpy.uint64(32)).astype(numpy.uint32),
+                (low_words & numpy.uint64(WORD_MASK)).astype(numpy.uint32)
+            )
+
+            return numpy.stack(keystream, axis=1).astype(">u4").tobytes()
 
-        for i in range(0, len(data), 16):
-            for j in range(0, min(len(data) - i, 16)):
-                out[i + j] ^= chunk[state[0]]
+        keystream = []
 
-                state[0] += 1
+        for i in range(blocks):
+            block = (counter + i) & COUNTER_MASK
+
+            keystream.extend(
+                encrypt_block(
+                    round_keys,
+                    ENCRYPT_TABLES,
+                    block >> 96,
+                    block >> 64 & WORD_MASK,
+                    block >> 32 & WORD_MASK,
+                    block & WORD_MASK
+                )
+            )
+
+        return pack(f">{len(keystream)}I", *keystream)
+
+
+    def ctr(data: bytes, key: bytes, iv: bytearray, state: bytearray) -> bytes:
+        # state[0] is the position inside the keystream block of the current iv (the counter)
+        if not data:
+            return b""
 
-                if state[0] >= 16:
-                    state[0] = 0
+        offset = state[0]
+        end = offset + len(data)
+        counter = int.from_bytes(iv, "big")
 
-                if state[0] == 0:
-                    for k in range(15, -1, -1):
-                        try:
-                            iv[k] += 1
-                            break
-                        except ValueError:
-                            iv[k] = 0
+        keystream = ctr_keystream(expand_key(bytes(key))[0], counter, (end + 15) // 16)
 
-                    chunk = cipher.encrypt(iv)
+        iv[:] = ((counter + end // 16) & COUNTER_MASK).to_bytes(16, "big")
+        state[0] = end % 16
 
-        return out
+        return xor(data, keystream[offset:end])
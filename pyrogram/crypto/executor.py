@@ -0,0 +1,78 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable
+
+import pyrogram
+from . import aes
+
+WORKERS = min(4, os.cpu_count() or 1)
+
+# Below this size (in bytes), hopping to the executor and back costs more than the work itself
+INLINE_THRESHOLD = 4096 if aes.TGCRYPTO_AVAILABLE else 512
+
+
+def create_executor(workers: int = WORKERS, use_processes: bool = False) -> Executor:
+    """Create an executor for MTProto packing and unpacking.
+
+    TgCrypto releases the GIL, so a few threads are enough to encrypt in parallel. The pure Python fallback holds
+    the GIL instead: pass use_processes=True to run it in worker processes. These are started from a clean process
+    (forkserver, or spawn where it isn't available) rather than forked from the running client, so the main script
+    must be guarded by ``if __name__ == "__main__"``.
+    """
+    if use_processes:
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+        return ProcessPoolExecutor(workers, mp_context=context)
+
+    return ThreadPoolExecutor(workers, thread_name_prefix="CryptoWorker")
+
+
+async def run(func: Callable, *args: Any, size: int, stateful: bool = False) -> Any:
+    """Run a crypto function in ``pyrogram.crypto_executor``, or inline if it works on less than INLINE_THRESHOLD bytes.
+
+    Stateful functions (i.e. the ones updating the AES-CTR state passed in) never leave the current process.
+    """
+    if size < INLINE_THRESHOLD:
+        return func(*args)
+
+    executor = pyrogram.crypto_executor
+
+    if isinstance(executor, ProcessPoolExecutor):
+        if stateful:
+            executor = None
+        else:
+            args = tuple(picklable(arg) for arg in args)
+
+    return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+
+
+def picklable(arg: Any) -> Any:
+    # Received packets are memoryviews, which can't be sent to worker processes as they are
+    if isinstance(arg, memoryview):
+        return bytes(arg)
+
+    if isinstance(arg, list):
+        return [picklable(item) for item in arg]
+
+    return arg
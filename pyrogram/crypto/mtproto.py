@@ -17,11 +17,10 @@
 #  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
 from hashlib import sha256
-from io import BytesIO
 from os import urandom
 
 from pyrogram.errors import SecurityCheckMismatch
-from pyrogram.raw.core import Message, Long
+from pyrogram.raw.core import Message, TLReader, TLWriter
 from . import aes
 
 
@@ -39,28 +38,37 @@ def kdf(auth_key: bytes, msg_key: bytes, outgoing: bool) -> tuple:
 
 
 def pack(message: Message, salt: int, session_id: bytes, auth_key: bytes, auth_key_id: bytes) -> bytes:
-    data = Long(salt) + session_id + message.write()
-    padding = urandom(-(len(data) + 12) % 16 + 12)
+    # Salt (8) + session_id (8) + message, then padding: everything is written once into the same buffer
+    size = 16 + message.byte_size()
+    padding_size = -(size + 12) % 16 + 12
+
+    data = TLWriter(size + padding_size)
+    data.write_long(salt)
+    data.write(session_id)
+    message.write_to(data)
+    data.write(urandom(padding_size))
 
     # 88 = 88 + 0 (outgoing message)
-    msg_key_large = sha256(auth_key[88: 88 + 32] + data + padding).digest()
-    msg_key = msg_key_large[8:24]
+    msg_key_large = sha256(auth_key[88: 88 + 32])
+    msg_key_large.update(data.buffer)
+    msg_key = msg_key_large.digest()[8:24]
     aes_key, aes_iv = kdf(auth_key, msg_key, True)
 
-    return auth_key_id + msg_key + aes.ige256_encrypt(data + padding, aes_key, aes_iv)
+    return auth_key_id + msg_key + aes.ige256_encrypt(data.buffer, aes_key, aes_iv)
 
 
 def unpack(
-    b: BytesIO,
+    packet: bytes,
     session_id: bytes,
     auth_key: bytes,
     auth_key_id: bytes
 ) -> Message:
-    SecurityCheckMismatch.check(b.read(8) == auth_key_id, "b.read(8) == auth_key_id")
+    SecurityCheckMismatch.check(packet[:8] == auth_key_id, "packet[:8] == auth_key_id")
 
-    msg_key = b.read(16)
+    msg_key = bytes(packet[8:24])
     aes_key, aes_iv = kdf(auth_key, msg_key, False)
-    data = BytesIO(aes.ige256_decrypt(b.read(), aes_key, aes_iv))
+    plaintext = aes.ige256_decrypt(memoryview(packet)[24:], aes_key, aes_iv)
+    data = TLReader(plaintext)
     data.read(8)  # Salt
 
     # https://core.telegram.org/mtproto/security_guidelines#checking-session-id
@@ -83,8 +91,8 @@ def unpack(
     # https://core.telegram.org/mtproto/security_guidelines#checking-sha256-hash-value-of-msg-key
     # 96 = 88 + 8 (incoming message)
     SecurityCheckMismatch.check(
-        msg_key == sha256(auth_key[96:96 + 32] + data.getvalue()).digest()[8:24],
-        "msg_key == sha256(auth_key[96:96 + 32] + data.getvalue()).digest()[8:24]"
+        msg_key == sha256(auth_key[96:96 + 32] + plaintext).digest()[8:24],
+        "msg_key == sha256(auth_key[96:96 + 32] + plaintext).digest()[8:24]"
     )
 
     # https://core.telegram.org/mtproto/security_guidelines#checking-message-length
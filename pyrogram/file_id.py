@@ -23,7 +23,7 @@ from enum import IntEnum
 from io import BytesIO
 from typing import List
 
-from pyrogram.raw.core import Bytes, String
+from pyrogram.raw.core import Bytes, String, TLReader
 
 log = logging.getLogger(__name__)
 
@@ -206,10 +206,10 @@ class FileId:
 
         if major < 4:
             minor = 0
-            buffer = BytesIO(decoded[:-1])
+            buffer = TLReader(decoded[:-1])
         else:
             minor = decoded[-2]
-            buffer = BytesIO(decoded[:-2])
+            buffer = TLReader(decoded[:-2])
         # endregion
 
         file_type, dc_id = struct.unpack("<ii", buffer.read(8))
@@ -428,7 +428,7 @@ class FileUniqueId:
 
     @staticmethod
     def decode(file_unique_id: str):
-        buffer = BytesIO(rle_decode(b64_decode(file_unique_id)))
+        buffer = TLReader(rle_decode(b64_decode(file_unique_id)))
         file_unique_type, = struct.unpack("<i", buffer.read(4))
 
         try:
@@ -32,7 +32,8 @@ class Invoke:
         query: TLObject,
         retries: int = Session.MAX_RETRIES,
         timeout: float = Session.WAIT_TIMEOUT,
-        sleep_threshold: float = None
+        sleep_threshold: float = None,
+        deadline: float = None
     ):
         """Invoke raw Telegram functions.
 
@@ -61,26 +62,39 @@ class Invoke:
             sleep_threshold (``float``):
                 Sleep threshold in seconds.
 
+            deadline (``float``, *optional*):
+                Maximum time in seconds for the whole call, retries and flood waits included. Once it's exceeded,
+                the request is given up and its answer dropped.
+
         Returns:
             ``RawType``: The raw type response generated by the query.
 
         Raises:
             RPCError: In case of a Telegram RPC error.
+            TimeoutError: In case the request timed out or its deadline was exceeded.
         """
         if not self.is_connected:
             raise ConnectionError("Client has not been started yet")
 
-        if self.no_updates:
+        session = self.session
+
+        # Requests are only spread across connections once logged in, when the auth key can't change anymore
+        if self.request_router is not None and self.is_initialized:
+            session = await self.request_router.get(query)
+
+        # Updates are only received through the main session
+        if self.no_updates or session is not self.session:
             query = raw.functions.InvokeWithoutUpdates(query=query)
 
         if self.takeout_id:
             query = raw.functions.InvokeWithTakeout(takeout_id=self.takeout_id, query=query)
 
-        r = await self.session.invoke(
+        r = await session.invoke(
             query, retries, timeout,
             (sleep_threshold
              if sleep_threshold is not None
-             else self.sleep_threshold)
+             else self.sleep_threshold),
+            deadline
         )
 
         await self.fetch_peers(getattr(r, "users", []))
@@ -23,14 +23,14 @@ import io
 import logging
 import math
 import os
+import time
 from hashlib import md5
 from pathlib import PurePath
 from typing import Union, BinaryIO, Callable
 
 import pyrogram
-from pyrogram import StopTransmission
 from pyrogram import raw
-from pyrogram.session import Session
+from pyrogram.errors import FloodWait, FloodPremiumWait
 
 log = logging.getLogger(__name__)
 
@@ -42,7 +42,8 @@ class SaveFile:
         file_id: int = None,
         file_part: int = 0,
         progress: Callable = None,
-        progress_args: tuple = ()
+        progress_args: tuple = (),
+        workers: int = None
     ):
         """Upload a file onto Telegram servers, without actually sending the message to anyone.
         Useful whenever an InputFile type is required.
@@ -69,14 +70,20 @@ class SaveFile:
             progress (``Callable``, *optional*):
                 Pass a callback function to view the file transmission progress.
                 The function must take *(current, total)* as positional arguments (look at Other Parameters below for a
-                detailed description) and will be called back each time a new file chunk has been successfully
-                transmitted.
+                detailed description) and will be called back each time a file part has been acknowledged by the
+                server. Callbacks that also take a *part_time* keyword argument (or any keyword argument) get the
+                upload time of that part.
 
             progress_args (``tuple``, *optional*):
                 Extra custom arguments for the progress callback function.
                 You can pass anything you need to be available in the progress callback scope; for example, a Message
                 object or a Client instance in order to edit the message with the updated progress status.
 
+            workers (``int``, *optional*):
+                Maximum amount of file parts to upload in parallel. The actual amount adapts to the network
+                conditions and never exceeds this value.
+                Defaults to the client's *upload_workers* setting.
+
         Other Parameters:
             current (``int``):
                 The amount of bytes transmitted so far.
@@ -84,6 +91,10 @@ class SaveFile:
             total (``int``):
                 The total size of the file.
 
+            part_time (``float``, *optional*):
+                How long the file part just acknowledged took to upload, in seconds. Only passed to callbacks that
+                accept it.
+
             *args (``tuple``, *optional*):
                 Extra custom arguments as defined in the ``progress_args`` parameter.
                 You can either keep ``*args`` or add every single extra argument in your function signature.
@@ -92,24 +103,13 @@ class SaveFile:
             ``InputFile``: On success, the uploaded file is returned in form of an InputFile object.
 
         Raises:
-            RPCError: In case of a Telegram RPC error.
+            RPCError: In case of a Telegram RPC error, once a file part could not be uploaded. The parts still in
+                flight are cancelled.
         """
         async with self.save_file_semaphore:
             if path is None:
                 return None
 
-            async def worker(session):
-                while True:
-                    data = await queue.get()
-
-                    if data is None:
-                        return
-
-                    try:
-                        await session.invoke(data)
-                    except Exception as e:
-                        log.exception(e)
-
             part_size = 512 * 1024
 
             if isinstance(path, (str, PurePath)):
@@ -135,71 +135,106 @@ class SaveFile:
 
             file_total_parts = int(math.ceil(file_size / part_size))
             is_big = file_size > 10 * 1024 * 1024
-            workers_count = 4 if is_big else 1
             is_missing_part = file_id is not None
             file_id = file_id or self.rnd_id()
             md5_sum = md5() if not is_big and not is_missing_part else None
-            session = Session(
-                self, await self.storage.dc_id(), await self.storage.auth_key(),
-                await self.storage.test_mode(), is_media=True
-            )
-            workers = [self.loop.create_task(worker(session)) for _ in range(workers_count)]
-            queue = asyncio.Queue(1)
-
-            try:
-                await session.start()
+            pool = self.get_session_pool(await self.storage.dc_id())
+            window = UploadWindow(self.upload_workers if workers is None else workers)
+            progress_takes_part_time = progress is not None and takes_keyword(progress, "part_time")
 
-                fp.seek(part_size * file_part)
+            async def upload_part(part: int, chunk: bytes) -> float:
+                if is_big:
+                    rpc = raw.functions.upload.SaveBigFilePart(
+                        file_id=file_id,
+                        file_part=part,
+                        file_total_parts=file_total_parts,
+                        bytes=chunk
+                    )
+                else:
+                    rpc = raw.functions.upload.SaveFilePart(
+                        file_id=file_id,
+                        file_part=part,
+                        bytes=chunk
+                    )
 
                 while True:
-                    chunk = fp.read(part_size)
+                    session = await pool.get()
+                    start = time.monotonic()
 
-                    if not chunk:
-                        if not is_big and not is_missing_part:
-                            md5_sum = "".join([hex(i)[2:].zfill(2) for i in md5_sum.digest()])
-                        break
+                    try:
+                        await session.invoke(rpc, sleep_threshold=0)
+                    except (FloodWait, FloodPremiumWait) as e:
+                        if e.value > self.sleep_threshold >= 0:
+                            raise
 
-                    if is_big:
-                        rpc = raw.functions.upload.SaveBigFilePart(
-                            file_id=file_id,
-                            file_part=file_part,
-                            file_total_parts=file_total_parts,
-                            bytes=chunk
-                        )
+                        window.on_flood_wait()
+
+                        log.warning("Waiting for %s seconds before uploading part %s", e.value, part)
+                        await asyncio.sleep(e.value)
                     else:
-                        rpc = raw.functions.upload.SaveFilePart(
-                            file_id=file_id,
-                            file_part=file_part,
-                            bytes=chunk
-                        )
+                        return time.monotonic() - start
+
+            in_flight = {}
+            uploaded = 0
+            is_eof = False
+
+            try:
+                fp.seek(part_size * file_part)
+
+                while not is_eof or in_flight:
+                    while not is_eof and len(in_flight) < window.size:
+                        chunk = await self.loop.run_in_executor(self.executor, fp.read, part_size)
 
-                    await queue.put(rpc)
+                        if not chunk:
+                            is_eof = True
+                            break
 
-                    if is_missing_part:
-                        return
+                        if md5_sum is not None:
+                            md5_sum.update(chunk)
 
-                    if not is_big and not is_missing_part:
-                        md5_sum.update(chunk)
+                        in_flight[self.loop.create_task(upload_part(file_part, chunk))] = file_part, len(chunk)
+                        file_part += 1
 
-                    file_part += 1
+                        # Only the given part has to be uploaded again
+                        is_eof = is_missing_part
 
-                    if progress:
-                        func = functools.partial(
-                            progress,
-                            min(file_part * part_size, file_size),
-                            file_size,
-                            *progress_args
+                    if not in_flight:
+                        break
+
+                    done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+
+                    for task in done:
+                        part, size = in_flight.pop(task)
+                        elapsed = task.result()
+
+                        window.on_part_uploaded(elapsed)
+                        uploaded += size
+
+                        log.debug(
+                            "Uploaded part %s/%s in %.3f s (%s in flight)",
+                            part + 1, file_total_parts, elapsed, window.size
                         )
 
-                        if inspect.iscoroutinefunction(progress):
-                            await func()
-                        else:
-                            await self.loop.run_in_executor(self.executor, func)
-            except StopTransmission:
-                raise
-            except Exception as e:
-                log.exception(e)
-            else:
+                        if progress:
+                            func = functools.partial(
+                                progress,
+                                min(uploaded, file_size),
+                                file_size,
+                                *progress_args,
+                                **({"part_time": elapsed} if progress_takes_part_time else {})
+                            )
+
+                            if inspect.iscoroutinefunction(progress):
+                                await func()
+                            else:
+                                await self.loop.run_in_executor(self.executor, func)
+
+                if is_missing_part:
+                    return
+
+                if md5_sum is not None:
+                    md5_sum = "".join([hex(i)[2:].zfill(2) for i in md5_sum.digest()])
+
                 if is_big:
                     return raw.types.InputFileBig(
                         id=file_id,
@@ -215,12 +250,56 @@ class SaveFile:
                         md5_checksum=md5_sum
                     )
             finally:
-                for _ in workers:
-                    await queue.put(None)
-
-                await asyncio.gather(*workers)
+                # A part failing for good, already retried by invoke, fails the whole upload: the others are dropped
+                for task in in_flight:
+                    task.cancel()
 
-                await session.stop()
+                await asyncio.gather(*in_flight, return_exceptions=True)
 
                 if isinstance(path, (str, PurePath)):
                     fp.close()
+
+
+def takes_keyword(func: Callable, name: str) -> bool:
+    try:
+        parameters = inspect.signature(func).parameters.values()
+    except (TypeError, ValueError):
+        return False
+
+    return any(
+        p.kind == p.VAR_KEYWORD or (p.name == name and p.kind in (p.POSITIONAL_OR_KEYWORD, p.KEYWORD_ONLY))
+        for p in parameters
+    )
+
+
+class UploadWindow:
+    """Amount of file parts kept in flight during an upload, adjusted to the observed part latency.
+
+    The window grows by about one part per round of acknowledged parts as long as parts are uploaded
+    nearly as fast as the quickest one seen so far, and shrinks again once their latency doubles, which
+    means requests are queueing up rather than being transferred in parallel. Flood waits halve it.
+    """
+
+    INITIAL_SIZE = 2
+    LATENCY_FACTOR = 2
+
+    def __init__(self, limit: int):
+        self.limit = max(1, limit)
+        self.value = float(min(self.INITIAL_SIZE, self.limit))
+        self.best_latency = None
+
+    @property
+    def size(self) -> int:
+        return int(self.value)
+
+    def on_part_uploaded(self, latency: float):
+        if self.best_latency is None or latency < self.best_latency:
+            self.best_latency = latency
+
+        if latency > self.best_latency * self.LATENCY_FACTOR:
+            self.value = max(1.0, self.value - 1 / self.value)
+        else:
+            self.value = min(float(self.limit), self.value + 1 / self.value)
+
+    def on_flood_wait(self):
+        self.value = max(1.0, self.value / 2)
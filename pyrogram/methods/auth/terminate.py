@@ -46,10 +46,14 @@ class Terminate:
         await self.storage.save()
         await self.dispatcher.stop()
 
-        for media_session in self.media_sessions.values():
-            await media_session.stop()
+        for pool in [*self.media_session_pools.values(), *self.cdn_session_pools.values()]:
+            await pool.stop()
 
-        self.media_sessions.clear()
+        self.media_session_pools.clear()
+        self.cdn_session_pools.clear()
+
+        if self.request_router is not None:
+            await self.request_router.stop()
 
         self.updates_watchdog_event.set()
 
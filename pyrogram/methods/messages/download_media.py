@@ -36,7 +36,10 @@ class DownloadMedia:
         in_memory: bool = False,
         block: bool = True,
         progress: Callable = None,
-        progress_args: tuple = ()
+        progress_args: tuple = (),
+        workers: int = None,
+        byte_offset: int = None,
+        byte_limit: int = None
     ) -> Optional[Union[str, BinaryIO]]:
         """Download the media from a message.
 
@@ -73,6 +76,18 @@ class DownloadMedia:
                 You can pass anything you need to be available in the progress callback scope; for example, a Message
                 object or a Client instance in order to edit the message with the updated progress status.
 
+            workers (``int``, *optional*):
+                Amount of file parts to request in parallel.
+                Defaults to the client's *download_workers* setting.
+
+            byte_offset (``int``, *optional*):
+                Position of the first byte to download. Negative values count from the end of the file.
+                Defaults to 0 (download from the beginning).
+
+            byte_limit (``int``, *optional*):
+                Amount of bytes to download starting from *byte_offset*.
+                Defaults to None (download up to the end of the file).
+
         Other Parameters:
             current (``int``):
                 The amount of bytes transmitted so far.
@@ -90,6 +105,10 @@ class DownloadMedia:
             :meth:`~pyrogram.Client.stop_transmission`, None is returned.
             Otherwise, in case ``in_memory=True``, a binary file-like object with its attribute ".name" set is returned.
 
+            Downloads that fail are kept next to the destination as a ".temp" file together with a ".temp.parts"
+            journal, and downloading the same media to the same path again resumes them where they stopped. When a
+            Message is passed, an expired file reference is refreshed automatically by fetching the message again.
+
         Raises:
             ValueError: if the message doesn't contain any downloadable media
 
@@ -122,6 +141,8 @@ class DownloadMedia:
         available_media = ("audio", "document", "photo", "sticker", "animation", "video", "voice", "video_note",
                            "new_chat_photo")
 
+        refresh_file_id = None
+
         if isinstance(message, types.Message):
             for kind in available_media:
                 media = getattr(message, kind, None)
@@ -130,6 +151,10 @@ class DownloadMedia:
                     break
             else:
                 raise ValueError("This message doesn't contain any downloadable media")
+
+            async def refresh_file_id() -> FileId:
+                refreshed_message = await self.get_messages(message.chat.id, message.id)
+                return FileId.decode(getattr(refreshed_message, kind).file_id)
         else:
             media = message
 
@@ -178,7 +203,10 @@ class DownloadMedia:
             )
 
         downloader = self.handle_download(
-            (file_id_obj, directory, file_name, in_memory, file_size, progress, progress_args)
+            (
+                file_id_obj, directory, file_name, in_memory, file_size, progress, progress_args,
+                workers, byte_offset, byte_limit, refresh_file_id
+            )
         )
 
         if block:
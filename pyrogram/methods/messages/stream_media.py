@@ -29,7 +29,10 @@ class StreamMedia:
         self: "pyrogram.Client",
         message: Union["types.Message", str],
         limit: int = 0,
-        offset: int = 0
+        offset: int = 0,
+        workers: int = None,
+        byte_offset: int = None,
+        byte_limit: int = None
     ) -> Optional[Union[str, BinaryIO]]:
         """Stream the media from a message chunk by chunk.
 
@@ -51,6 +54,17 @@ class StreamMedia:
                 How many chunks to skip before starting to stream.
                 Defaults to 0 (start from the beginning).
 
+            workers (``int``, *optional*):
+                Amount of chunks to request in parallel.
+                Defaults to the client's *download_workers* setting.
+
+            byte_offset (``int``, *optional*):
+                Position of the first byte to stream, instead of a chunk *offset*. Negative values count from the end
+                of the media.
+
+            byte_limit (``int``, *optional*):
+                Amount of bytes to stream, instead of a chunk *limit*. The chunks yielded are trimmed to fit the range.
+
         Returns:
             ``Generator``: A generator yielding bytes chunk by chunk
 
@@ -72,6 +86,10 @@ class StreamMedia:
                 # Stream the last 3 chunks only (negative offset)
                 async for chunk in app.stream_media(message, offset=-3):
                     print(len(chunk))
+
+                # Stream an arbitrary byte range
+                async for chunk in app.stream_media(message, byte_offset=1000, byte_limit=5000):
+                    print(len(chunk))
         """
         available_media = ("audio", "document", "photo", "sticker", "animation", "video", "voice", "video_note",
                            "new_chat_photo")
@@ -102,5 +120,7 @@ class StreamMedia:
             chunks = math.ceil(file_size / 1024 / 1024)
             offset += chunks
 
-        async for chunk in self.get_file(file_id_obj, file_size, limit, offset):
+        async for chunk in self.get_file(
+            file_id_obj, file_size, limit, offset, workers=workers, byte_offset=byte_offset, byte_limit=byte_limit
+        ):
             yield chunk
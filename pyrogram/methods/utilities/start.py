@@ -65,7 +65,9 @@ class Start:
                 self.takeout_id = (await self.invoke(raw.functions.account.InitTakeoutSession())).id
                 log.info("Takeout session %s initiated", self.takeout_id)
 
-            await self.invoke(raw.functions.updates.GetState())
+            state = await self.invoke(raw.functions.updates.GetState())
+            self.updates_pts = state.pts
+            self.updates_date = state.date
         except (Exception, KeyboardInterrupt):
             await self.disconnect()
             raise
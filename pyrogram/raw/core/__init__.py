@@ -29,3 +29,5 @@ from .primitives.int import Int, Long, Int128, Int256
 from .primitives.string import String
 from .primitives.vector import Vector
 from .tl_object import TLObject
+from .tl_reader import TLReader
+from .tl_writer import TLWriter
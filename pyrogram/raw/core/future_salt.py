@@ -16,11 +16,12 @@
 #  You should have received a copy of the GNU Lesser General Public License
 #  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
-from io import BytesIO
 from typing import Any
 
 from .primitives.int import Int, Long
 from .tl_object import TLObject
+from .tl_reader import TLReader
+from .tl_writer import TLWriter
 
 
 class FutureSalt(TLObject):
@@ -36,18 +37,17 @@ class FutureSalt(TLObject):
         self.salt = salt
 
     @staticmethod
-    def read(data: BytesIO, *args: Any) -> "FutureSalt":
+    def read(data: TLReader, *args: Any) -> "FutureSalt":
         valid_since = Int.read(data)
         valid_until = Int.read(data)
         salt = Long.read(data)
 
         return FutureSalt(valid_since, valid_until, salt)
 
-    def write(self, *args: Any) -> bytes:
-        b = BytesIO()
+    def byte_size(self) -> int:
+        return 16
 
-        b.write(Int(self.valid_since))
-        b.write(Int(self.valid_until))
-        b.write(Long(self.salt))
-
-        return b.getvalue()
+    def write_to(self, b: TLWriter) -> None:
+        b.write_int(self.valid_since)
+        b.write_int(self.valid_until)
+        b.write_long(self.salt)
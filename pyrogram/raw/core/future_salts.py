@@ -16,12 +16,13 @@
 #  You should have received a copy of the GNU Lesser General Public License
 #  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
-from io import BytesIO
 from typing import Any, List
 
 from .future_salt import FutureSalt
 from .primitives.int import Int, Long
 from .tl_object import TLObject
+from .tl_reader import TLReader
+from .tl_writer import TLWriter
 
 
 class FutureSalts(TLObject):
@@ -37,7 +38,7 @@ class FutureSalts(TLObject):
         self.salts = salts
 
     @staticmethod
-    def read(data: BytesIO, *args: Any) -> "FutureSalts":
+    def read(data: TLReader, *args: Any) -> "FutureSalts":
         req_msg_id = Long.read(data)
         now = Int.read(data)
 
@@ -46,18 +47,17 @@ class FutureSalts(TLObject):
 
         return FutureSalts(req_msg_id, now, salts)
 
-    def write(self, *args: Any) -> bytes:
-        b = BytesIO()
+    def byte_size(self) -> int:
+        return 20 + 16 * len(self.salts)
 
-        b.write(Int(self.ID, False))
+    def write_to(self, b: TLWriter) -> None:
+        b.write_int(self.ID, False)
 
-        b.write(Long(self.req_msg_id))
-        b.write(Int(self.now))
+        b.write_long(self.req_msg_id)
+        b.write_int(self.now)
 
         count = len(self.salts)
-        b.write(Int(count))
+        b.write_int(count)
 
         for salt in self.salts:
-            b.write(salt.write())
-
-        return b.getvalue()
+            salt.write_to(b)
@@ -16,13 +16,13 @@
 #  You should have received a copy of the GNU Lesser General Public License
 #  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
-from gzip import compress, decompress
-from io import BytesIO
 from typing import cast, Any
+from zlib import DEFLATED, MAX_WBITS, compressobj, decompressobj
 
 from .primitives.bytes import Bytes
 from .primitives.int import Int
 from .tl_object import TLObject
+from .tl_reader import TLReader
 
 
 class GzipPacked(TLObject):
@@ -36,27 +36,23 @@ class GzipPacked(TLObject):
         self.packed_data = packed_data
 
     @staticmethod
-    def read(data: BytesIO, *args: Any) -> "GzipPacked":
-        # Return the Object itself instead of a GzipPacked wrapping it
+    def read(data: TLReader, *args: Any) -> "GzipPacked":
+        # Return the Object itself instead of a GzipPacked wrapping it. The payload is decompressed straight from
+        # the packet buffer (the header is detected automatically, gzip or zlib)
         return cast(GzipPacked, TLObject.read(
-            BytesIO(
-                decompress(
-                    Bytes.read(data)
+            TLReader(
+                decompressobj(32 + MAX_WBITS).decompress(
+                    data.read_bytes()
                 )
             )
         ))
 
-    def write(self, *args: Any) -> bytes:
-        b = BytesIO()
-
-        b.write(Int(self.ID, False))
+    @staticmethod
+    def pack(data: bytes, level: int = 6) -> bytes:
+        """Wrap an already serialized object into a serialized gzip_packed."""
+        compressor = compressobj(level, DEFLATED, 16 + MAX_WBITS)
 
-        b.write(
-            Bytes(
-                compress(
-                    self.packed_data.write()
-                )
-            )
-        )
+        return Int(GzipPacked.ID, False) + Bytes(compressor.compress(data) + compressor.flush())
 
-        return b.getvalue()
+    def write(self, *args: Any) -> bytes:
+        return GzipPacked.pack(self.packed_data.write())
@@ -16,41 +16,51 @@
 #  You should have received a copy of the GNU Lesser General Public License
 #  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
-from io import BytesIO
 from typing import Any
 
 from .primitives.int import Int, Long
 from .tl_object import TLObject
+from .tl_reader import TLReader
+from .tl_writer import TLWriter
 
 
 class Message(TLObject):
     ID = 0x5BB8E511  # hex(crc32(b"message msg_id:long seqno:int bytes:int body:Object = Message"))
 
-    __slots__ = ["msg_id", "seq_no", "length", "body"]
+    __slots__ = ["msg_id", "seq_no", "length", "body", "data"]
 
     QUALNAME = "Message"
 
-    def __init__(self, body: TLObject, msg_id: int, seq_no: int, length: int):
+    def __init__(self, body: TLObject, msg_id: int, seq_no: int, length: int, data: bytes = None):
         self.msg_id = msg_id
         self.seq_no = seq_no
         self.length = length
         self.body = body
+        # The body already serialized, written as is
+        self.data = data
+
+    def __reduce__(self):
+        # Serialized bodies are pickled (e.g.: for the crypto executor) as bytes only
+        return Message, (self.body if self.data is None else None, self.msg_id, self.seq_no, self.length, self.data)
 
     @staticmethod
-    def read(data: BytesIO, *args: Any) -> "Message":
+    def read(data: TLReader, *args: Any) -> "Message":
         msg_id = Long.read(data)
         seq_no = Int.read(data)
         length = Int.read(data)
         body = data.read(length)
 
-        return Message(TLObject.read(BytesIO(body)), msg_id, seq_no, length)
+        return Message(TLObject.read(TLReader(body)), msg_id, seq_no, length)
 
-    def write(self, *args: Any) -> bytes:
-        b = BytesIO()
+    def byte_size(self) -> int:
+        return 16 + self.length
 
-        b.write(Long(self.msg_id))
-        b.write(Int(self.seq_no))
-        b.write(Int(self.length))
-        b.write(self.body.write())
+    def write_to(self, b: TLWriter) -> None:
+        b.write_long(self.msg_id)
+        b.write_int(self.seq_no)
+        b.write_int(self.length)
 
-        return b.getvalue()
+        if self.data is not None:
+            b.write(self.data)
+        else:
+            self.body.write_to(b)
@@ -16,12 +16,13 @@
 #  You should have received a copy of the GNU Lesser General Public License
 #  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
-from io import BytesIO
 from typing import List, Any
 
 from .message import Message
 from .primitives.int import Int
 from .tl_object import TLObject
+from .tl_reader import TLReader
+from .tl_writer import TLWriter
 
 
 class MsgContainer(TLObject):
@@ -35,19 +36,18 @@ class MsgContainer(TLObject):
         self.messages = messages
 
     @staticmethod
-    def read(data: BytesIO, *args: Any) -> "MsgContainer":
+    def read(data: TLReader, *args: Any) -> "MsgContainer":
         count = Int.read(data)
         return MsgContainer([Message.read(data) for _ in range(count)])
 
-    def write(self, *args: Any) -> bytes:
-        b = BytesIO()
+    def byte_size(self) -> int:
+        return 8 + sum(message.byte_size() for message in self.messages)
 
-        b.write(Int(self.ID, False))
+    def write_to(self, b: TLWriter) -> None:
+        b.write_int(self.ID, False)
 
         count = len(self.messages)
-        b.write(Int(count))
+        b.write_int(count)
 
         for message in self.messages:
-            b.write(message.write())
-
-        return b.getvalue()
+            message.write_to(b)
@@ -16,10 +16,11 @@
 #  You should have received a copy of the GNU Lesser General Public License
 #  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
-from io import BytesIO
 from typing import Any
 
 from ..tl_object import TLObject
+from ..tl_reader import TLReader
+from ..tl_writer import TLWriter
 
 
 class BoolFalse(bytes, TLObject):
@@ -41,8 +42,16 @@ class BoolTrue(BoolFalse):
 
 class Bool(bytes, TLObject):
     @classmethod
-    def read(cls, data: BytesIO, *args: Any) -> bool:
-        return int.from_bytes(data.read(4), "little") == BoolTrue.ID
+    def read(cls, data: TLReader, *args: Any) -> bool:
+        return data.read_int(False) == BoolTrue.ID
+
+    @classmethod
+    def size_of(cls, value: bool) -> int:
+        return 4
+
+    @classmethod
+    def write_into(cls, b: TLWriter, value: bool) -> None:
+        b.write_bool(value)
 
     def __new__(cls, value: bool) -> bytes:  # type: ignore
         return BoolTrue() if value else BoolFalse()
@@ -16,26 +16,25 @@
 #  You should have received a copy of the GNU Lesser General Public License
 #  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
-from io import BytesIO
 from typing import Any
 
 from ..tl_object import TLObject
+from ..tl_reader import TLReader
+from ..tl_writer import TLWriter
 
 
 class Bytes(bytes, TLObject):
     @classmethod
-    def read(cls, data: BytesIO, *args: Any) -> bytes:
-        length = int.from_bytes(data.read(1), "little")
+    def read(cls, data: TLReader, *args: Any) -> bytes:
+        return bytes(data.read_bytes())
 
-        if length <= 253:
-            x = data.read(length)
-            data.read(-(length + 1) % 4)
-        else:
-            length = int.from_bytes(data.read(3), "little")
-            x = data.read(length)
-            data.read(-length % 4)
+    @classmethod
+    def size_of(cls, value: bytes) -> int:
+        return TLWriter.bytes_size(value)
 
-        return x
+    @classmethod
+    def write_into(cls, b: TLWriter, value: bytes) -> None:
+        b.write_bytes(value)
 
     def __new__(cls, value: bytes) -> bytes:  # type: ignore
         length = len(value)
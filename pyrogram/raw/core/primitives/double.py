@@ -16,17 +16,26 @@
 #  You should have received a copy of the GNU Lesser General Public License
 #  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
-from io import BytesIO
-from struct import unpack, pack
-from typing import cast, Any
+from struct import pack
+from typing import Any
 
 from ..tl_object import TLObject
+from ..tl_reader import TLReader
+from ..tl_writer import TLWriter
 
 
 class Double(bytes, TLObject):
     @classmethod
-    def read(cls, data: BytesIO, *args: Any) -> float:
-        return cast(float, unpack("d", data.read(8))[0])
+    def read(cls, data: TLReader, *args: Any) -> float:
+        return data.read_double()
+
+    @classmethod
+    def size_of(cls, value: float) -> int:
+        return 8
+
+    @classmethod
+    def write_into(cls, b: TLWriter, value: float) -> None:
+        b.write_double(value)
 
     def __new__(cls, value: float) -> bytes:  # type: ignore
         return pack("d", value)
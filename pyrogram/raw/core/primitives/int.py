@@ -16,18 +16,27 @@
 #  You should have received a copy of the GNU Lesser General Public License
 #  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
-from io import BytesIO
 from typing import Any
 
 from ..tl_object import TLObject
+from ..tl_reader import TLReader
+from ..tl_writer import TLWriter
 
 
 class Int(bytes, TLObject):
     SIZE = 4
 
     @classmethod
-    def read(cls, data: BytesIO, signed: bool = True, *args: Any) -> int:
-        return int.from_bytes(data.read(cls.SIZE), "little", signed=signed)
+    def read(cls, data: TLReader, signed: bool = True, *args: Any) -> int:
+        return data.read_int(signed)
+
+    @classmethod
+    def size_of(cls, value: int) -> int:
+        return cls.SIZE
+
+    @classmethod
+    def write_into(cls, b: TLWriter, value: int, signed: bool = True) -> None:
+        b.write_int(value, signed)
 
     def __new__(cls, value: int, signed: bool = True) -> bytes:  # type: ignore
         return value.to_bytes(cls.SIZE, "little", signed=signed)
@@ -36,10 +45,26 @@ class Int(bytes, TLObject):
 class Long(Int):
     SIZE = 8
 
+    @classmethod
+    def read(cls, data: TLReader, signed: bool = True, *args: Any) -> int:
+        return data.read_long(signed)
+
+    @classmethod
+    def write_into(cls, b: TLWriter, value: int, signed: bool = True) -> None:
+        b.write_long(value, signed)
+
 
 class Int128(Int):
     SIZE = 16
 
+    @classmethod
+    def read(cls, data: TLReader, signed: bool = True, *args: Any) -> int:
+        return data.read_large_int(cls.SIZE, signed)
+
+    @classmethod
+    def write_into(cls, b: TLWriter, value: int, signed: bool = True) -> None:
+        b.write_large_int(value, cls.SIZE, signed)
+
 
-class Int256(Int):
+class Int256(Int128):
     SIZE = 32
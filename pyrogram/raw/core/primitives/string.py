@@ -16,16 +16,23 @@
 #  You should have received a copy of the GNU Lesser General Public License
 #  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
-from io import BytesIO
-from typing import cast
-
 from .bytes import Bytes
+from ..tl_reader import TLReader
+from ..tl_writer import TLWriter
 
 
 class String(Bytes):
     @classmethod
-    def read(cls, data: BytesIO, *args) -> str:  # type: ignore
-        return cast(bytes, super(String, String).read(data)).decode(errors="replace")
+    def read(cls, data: TLReader, *args) -> str:  # type: ignore
+        return str(data.read_bytes(), "utf-8", "replace")
+
+    @classmethod
+    def size_of(cls, value: str) -> int:  # type: ignore
+        return TLWriter.string_size(value)
+
+    @classmethod
+    def write_into(cls, b: TLWriter, value: str) -> None:  # type: ignore
+        b.write_string(value)
 
     def __new__(cls, value: str) -> bytes:  # type: ignore
         return super().__new__(cls, value.encode())
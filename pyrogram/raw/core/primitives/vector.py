@@ -16,12 +16,13 @@
 #  You should have received a copy of the GNU Lesser General Public License
 #  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
-from io import BytesIO
 from typing import cast, Union, Any
 
 from .int import Int, Long
 from ..list import List
 from ..tl_object import TLObject
+from ..tl_reader import TLReader
+from ..tl_writer import TLWriter
 
 
 class Vector(bytes, TLObject):
@@ -30,7 +31,7 @@ class Vector(bytes, TLObject):
     # Method added to handle the special case when a query returns a bare Vector (of Ints);
     # i.e., RpcResult body starts with 0x1cb5c415 (Vector Id) - e.g., messages.GetMessagesViews.
     @staticmethod
-    def read_bare(b: BytesIO, size: int) -> Union[int, Any]:
+    def read_bare(b: TLReader, size: int) -> Union[int, Any]:
         if size == 4:
             return Int.read(b)
 
@@ -40,11 +41,9 @@ class Vector(bytes, TLObject):
         return TLObject.read(b)
 
     @classmethod
-    def read(cls, data: BytesIO, t: Any = None, *args: Any) -> List:
+    def read(cls, data: TLReader, t: Any = None, *args: Any) -> List:
         count = Int.read(data)
-        left = len(data.read())
-        size = (left / count) if count else 0
-        data.seek(-left, 1)
+        size = (data.remaining / count) if count else 0
 
         return List(
             t.read(data) if t
@@ -52,6 +51,25 @@ class Vector(bytes, TLObject):
             for _ in range(count)
         )
 
+    @classmethod
+    def size_of(cls, value: list, t: Any = None) -> int:
+        if t:
+            return 8 + sum(t.size_of(i) for i in value)
+
+        return 8 + sum(i.byte_size() for i in value)
+
+    @classmethod
+    def write_into(cls, b: TLWriter, value: list, t: Any = None) -> None:
+        b.write_int(cls.ID, False)
+        b.write_int(len(value))
+
+        if t:
+            for i in value:
+                t.write_into(b, i)
+        else:
+            for i in value:
+                i.write_to(b)
+
     def __new__(cls, value: list, t: Any = None) -> bytes:  # type: ignore
         return b"".join(
             [Int(cls.ID, False), Int(len(value))]
@@ -16,10 +16,11 @@
 #  You should have received a copy of the GNU Lesser General Public License
 #  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
-from io import BytesIO
 from json import dumps
 from typing import cast, List, Any, Union, Dict
 
+from .tl_reader import TLReader
+from .tl_writer import TLWriter
 from ..all import objects
 
 
@@ -29,11 +30,21 @@ class TLObject:
     QUALNAME = "Base"
 
     @classmethod
-    def read(cls, b: BytesIO, *args: Any) -> Any:
-        return cast(TLObject, objects[int.from_bytes(b.read(4), "little")]).read(b, *args)
+    def read(cls, b: TLReader, *args: Any) -> Any:
+        return cast(TLObject, objects[b.read_int(False)]).read(b, *args)
 
     def write(self, *args: Any) -> bytes:
-        pass
+        b = TLWriter(self.byte_size())
+        self.write_to(b)
+
+        return b.getvalue()
+
+    def byte_size(self) -> int:
+        # Objects overriding write() alone are measured by serializing them
+        return len(self.write())
+
+    def write_to(self, b: TLWriter) -> None:
+        b.write(self.write())
 
     @staticmethod
     def default(obj: "TLObject") -> Union[str, Dict[str, str]]:
@@ -76,7 +87,7 @@ class TLObject:
         return True
 
     def __len__(self) -> int:
-        return len(self.write())
+        return self.byte_size()
 
     def __call__(self, *args: Any, **kwargs: Any) -> Any:
         pass
@@ -0,0 +1,112 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+from struct import Struct, error
+from typing import Union
+
+INT = Struct("<i")
+UINT = Struct("<I")
+LONG = Struct("<q")
+ULONG = Struct("<Q")
+DOUBLE = Struct("<d")
+
+
+class TLReader:
+    """Read TL data out of a single buffer.
+
+    Reads move an integer cursor along a memoryview of the whole buffer, so nested objects, vectors and message
+    bodies are decoded without copying the data they come from. Only the values handed to users (bytes and strings)
+    are copied out of it.
+    """
+
+    __slots__ = ["view", "position"]
+
+    def __init__(self, data: Union[bytes, bytearray, memoryview], position: int = 0):
+        self.view = memoryview(data)
+        self.position = position
+
+    @property
+    def remaining(self) -> int:
+        return max(len(self.view) - self.position, 0)
+
+    def read(self, size: int = -1) -> memoryview:
+        start = self.position
+        end = len(self.view) if size < 0 else start + size
+
+        self.position = end
+
+        return self.view[start:end]
+
+    def read_int(self, signed: bool = True) -> int:
+        start = self.position
+        self.position = start + 4
+
+        try:
+            return (INT if signed else UINT).unpack_from(self.view, start)[0]
+        except error:
+            # Past the end: behave like a short read would have
+            return int.from_bytes(self.view[start:start + 4], "little", signed=signed)
+
+    def read_long(self, signed: bool = True) -> int:
+        start = self.position
+        self.position = start + 8
+
+        try:
+            return (LONG if signed else ULONG).unpack_from(self.view, start)[0]
+        except error:
+            return int.from_bytes(self.view[start:start + 8], "little", signed=signed)
+
+    def read_large_int(self, size: int, signed: bool = True) -> int:
+        start = self.position
+        self.position = start + size
+
+        return int.from_bytes(self.view[start:start + size], "little", signed=signed)
+
+    def read_double(self) -> float:
+        start = self.position
+        self.position = start + 8
+
+        return DOUBLE.unpack_from(self.view, start)[0]
+
+    def read_bytes(self) -> memoryview:
+        view = self.view
+        start = self.position
+        length = view[start]
+
+        if length <= 253:
+            start += 1
+            self.position = start + length + (-(length + 1) % 4)
+        else:
+            length = int.from_bytes(view[start + 1:start + 4], "little")
+            start += 4
+            self.position = start + length + (-length % 4)
+
+        return view[start:start + length]
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        if whence == 1:
+            offset += self.position
+        elif whence == 2:
+            offset += len(self.view)
+
+        self.position = offset
+
+        return offset
+
+    def tell(self) -> int:
+        return self.position
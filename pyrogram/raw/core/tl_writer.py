@@ -0,0 +1,97 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+from struct import Struct
+
+INT = Struct("<i")
+UINT = Struct("<I")
+LONG = Struct("<q")
+ULONG = Struct("<Q")
+DOUBLE = Struct("<d")
+
+BOOL_TRUE = 0x997275B5
+BOOL_FALSE = 0xBC799737
+
+
+class TLWriter:
+    """Write TL data into a single preallocated buffer.
+
+    Objects know their serialized size in advance (see ``TLObject.byte_size``), so a whole object tree is written once,
+    field by field, into a buffer of the right size. Padding is never written: the buffer starts zeroed.
+    """
+
+    __slots__ = ["buffer", "position"]
+
+    def __init__(self, size: int):
+        self.buffer = bytearray(size)
+        self.position = 0
+
+    @staticmethod
+    def bytes_size(value: bytes) -> int:
+        length = len(value)
+
+        if length <= 253:
+            return (length + 4) & ~3
+
+        return ((length + 3) & ~3) + 4
+
+    @staticmethod
+    def string_size(value: str) -> int:
+        return TLWriter.bytes_size(value) if value.isascii() else TLWriter.bytes_size(value.encode())
+
+    def write(self, data: bytes) -> None:
+        start = self.position
+        self.position = start + len(data)
+        self.buffer[start:self.position] = data
+
+    def write_int(self, value: int, signed: bool = True) -> None:
+        (INT if signed else UINT).pack_into(self.buffer, self.position, value)
+        self.position += 4
+
+    def write_long(self, value: int, signed: bool = True) -> None:
+        (LONG if signed else ULONG).pack_into(self.buffer, self.position, value)
+        self.position += 8
+
+    def write_large_int(self, value: int, size: int, signed: bool = True) -> None:
+        self.write(value.to_bytes(size, "little", signed=signed))
+
+    def write_double(self, value: float) -> None:
+        DOUBLE.pack_into(self.buffer, self.position, value)
+        self.position += 8
+
+    def write_bool(self, value: bool) -> None:
+        self.write_int(BOOL_TRUE if value else BOOL_FALSE, False)
+
+    def write_bytes(self, value: bytes) -> None:
+        length = len(value)
+
+        if length <= 253:
+            self.buffer[self.position] = length
+            start = self.position + 1
+        else:
+            self.buffer[self.position:self.position + 4] = (length << 8 | 254).to_bytes(4, "little")
+            start = self.position + 4
+
+        self.buffer[start:start + length] = value
+        self.position = start + length + (-(start - self.position + length) % 4)
+
+    def write_string(self, value: str) -> None:
+        self.write_bytes(value.encode())
+
+    def getvalue(self) -> bytes:
+        return bytes(self.buffer)
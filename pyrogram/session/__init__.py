@@ -17,4 +17,7 @@
 #  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
 from .auth import Auth
+from .compression import CompressionPolicy
+from .routing import RoutingPolicy, RoundRobin, LeastInFlight, Lanes, RequestRouter
 from .session import Session
+from .session_pool import SessionPool
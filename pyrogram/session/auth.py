@@ -20,7 +20,6 @@ import asyncio
 import logging
 import time
 from hashlib import sha1
-from io import BytesIO
 from os import urandom
 
 import pyrogram
@@ -28,7 +27,7 @@ from pyrogram import raw
 from pyrogram.connection import Connection
 from pyrogram.crypto import aes, rsa, prime
 from pyrogram.errors import SecurityCheckMismatch
-from pyrogram.raw.core import TLObject, Long, Int
+from pyrogram.raw.core import TLObject, TLReader, Long, Int
 from .internals import MsgId
 
 log = logging.getLogger(__name__)
@@ -36,12 +35,15 @@ log = logging.getLogger(__name__)
 
 class Auth:
     MAX_RETRIES = 5
+    TIMEOUT = 10
 
     def __init__(self, client: "pyrogram.Client", dc_id: int, test_mode: bool):
         self.dc_id = dc_id
         self.test_mode = test_mode
         self.ipv6 = client.ipv6
         self.proxy = client.proxy
+        self.socket_options = client.socket_options
+        self.dc_options = client.dc_options
 
         self.connection = None
 
@@ -50,19 +52,19 @@ class Auth:
         return (
             bytes(8)
             + Long(MsgId())
-            + Int(len(data.write()))
+            + Int(data.byte_size())
             + data.write()
         )
 
     @staticmethod
-    def unpack(b: BytesIO):
+    def unpack(b: TLReader):
         b.seek(20)  # Skip auth_key_id (8), message_id (8) and message_length (4)
         return TLObject.read(b)
 
     async def invoke(self, data: TLObject):
         data = self.pack(data)
         await self.connection.send(data)
-        response = BytesIO(await self.connection.recv())
+        response = TLReader(await asyncio.wait_for(self.connection.recv(), Auth.TIMEOUT))
 
         return self.unpack(response)
 
@@ -76,7 +78,14 @@ class Auth:
         # The server may close the connection at any time, causing the auth key creation to fail.
         # If that happens, just try again up to MAX_RETRIES times.
         while True:
-            self.connection = Connection(self.dc_id, self.test_mode, self.ipv6, self.proxy)
+            self.connection = Connection(
+                self.dc_id,
+                self.test_mode,
+                self.ipv6,
+                self.proxy,
+                socket_options=self.socket_options,
+                dc_options=self.dc_options,
+            )
 
             try:
                 log.info("Start creating a new auth key on DC%s", self.dc_id)
@@ -161,7 +170,7 @@ class Auth:
                 answer_with_hash = aes.ige256_decrypt(encrypted_answer, tmp_aes_key, tmp_aes_iv)
                 answer = answer_with_hash[20:]
 
-                server_dh_inner_data = TLObject.read(BytesIO(answer))
+                server_dh_inner_data = TLObject.read(TLReader(answer))
 
                 log.debug("Done decrypting answer")
 
@@ -0,0 +1,85 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import annotations
+
+from typing import Iterable
+
+from pyrogram.raw.core import GzipPacked, TLObject
+
+from .routing import get_query_name
+
+
+class CompressionPolicy:
+    """Decide which outgoing requests are sent gzip-compressed.
+
+    Requests are compressed once serialized, and only sent compressed when that actually makes them smaller.
+    The amount of bytes compression saved so far is kept in :attr:`bytes_saved`.
+
+    Parameters:
+        min_size (``int``, *optional*):
+            Requests serialized to fewer bytes are never compressed.
+            Defaults to 1024.
+
+        types (``Iterable[str]``, *optional*):
+            Names of the requests to compress (e.g.: "messages.SendMultiMedia").
+            Defaults to every request, file parts excluded.
+
+        level (``int``, *optional*):
+            The zlib compression level, from 1 (fastest) to 9 (smallest).
+            Defaults to 6.
+    """
+
+    # File parts are mostly compressed media already
+    EXCLUDED = frozenset({"upload.SaveFilePart", "upload.SaveBigFilePart"})
+
+    def __init__(self, min_size: int = 1024, types: Iterable[str] = None, level: int = 6):
+        self.min_size = min_size
+        self.types = None if types is None else frozenset(types)
+        self.level = level
+
+        self.requests_compressed = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.bytes_in - self.bytes_out
+
+    def should_compress(self, query: TLObject, size: int) -> bool:
+        if size < self.min_size:
+            return False
+
+        name = get_query_name(query)
+
+        return name in self.types if self.types is not None else name not in self.EXCLUDED
+
+    def compress(self, query: TLObject, data: bytes) -> bytes:
+        if not self.should_compress(query, len(data)):
+            return data
+
+        packed = GzipPacked.pack(data, self.level)
+
+        if len(packed) >= len(data):
+            return data
+
+        self.requests_compressed += 1
+        self.bytes_in += len(data)
+        self.bytes_out += len(packed)
+
+        return packed
@@ -17,5 +17,8 @@
 #  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
 from .data_center import DataCenter
+from .dc_options import DcOptions
 from .msg_factory import MsgFactory
-from .msg_id import MsgId
+from .msg_id import MsgId, MsgIdGenerator
+from .request_limiter import RequestLimiter
+from .stored_msg_ids import StoredMsgIds
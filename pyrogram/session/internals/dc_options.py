@@ -0,0 +1,156 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import time
+from typing import Dict, List, Optional, Tuple
+
+from .data_center import DataCenter
+
+# dc_id, ip_address, port, test_mode, ipv6, media_only, tcpo_only, cdn, static
+DcOption = Tuple[int, str, int, bool, bool, bool, bool, bool, bool]
+
+
+class DcOptions:
+    """Addresses of the data centers, as listed by help.getConfig, ranked by how fast they can be connected to.
+
+    The addresses of a DC are tried fastest first, falling back to the hardcoded :obj:`DataCenter` address when the
+    list is unknown or exhausted. Connection times are measured by the connections themselves and only kept in
+    memory, while the list itself is kept in the storage.
+    """
+
+    # Weight of a new sample in the smoothed connection time of an address
+    LATENCY_WEIGHT = 0.3
+    # Seconds an address that failed to connect is tried after the others
+    FAILURE_TTL = 5 * 60
+
+    def __init__(self):
+        self.options: List[DcOption] = []
+        self.latencies: Dict[Tuple[str, int], float] = {}
+        self.failures: Dict[Tuple[str, int], float] = {}
+
+    def load(self, options: List[DcOption]):
+        self.options = [tuple(option) for option in options]
+
+    def update(self, config) -> Optional[List[DcOption]]:
+        """Take the addresses from a config and return them for the storage, or None if they didn't change."""
+        options = [
+            (
+                o.id, o.ip_address, o.port, bool(config.test_mode),
+                bool(o.ipv6), bool(o.media_only), bool(o.tcpo_only), bool(o.cdn), bool(o.static)
+            )
+            for o in config.dc_options
+        ]
+        # The storage keeps one entry per address: entries listing the same address are merged, so that the address
+        # stays usable for anything one of them allows (i.e. restrictions only hold if every entry has them)
+        merged: Dict[tuple, DcOption] = {}
+
+        for option in options:
+            other = merged.get(option[:4])
+
+            if other is not None:
+                option = option[:5] + (
+                    option[5] and other[5], option[6] and other[6], option[7] or other[7], option[8] or other[8]
+                )
+
+            merged[option[:4]] = option
+
+        options = list(merged.values())
+
+        if sorted(options) == sorted(self.options):
+            return None
+
+        self.options = options
+
+        return options
+
+    def report(self, address: Tuple[str, int], latency: Optional[float]):
+        """Record the time a connection to an address took, or None if it failed."""
+        if latency is None:
+            self.failures[address] = time.monotonic()
+            return
+
+        self.failures.pop(address, None)
+
+        last = self.latencies.get(address)
+        self.latencies[address] = latency if last is None else last + (latency - last) * self.LATENCY_WEIGHT
+
+    def get(
+        self, dc_id: int, test_mode: bool, ipv6: bool, media: bool, proxied: bool = False
+    ) -> List[Tuple[str, int]]:
+        """Return the addresses to connect to, best first.
+
+        IPv6 addresses are only included when *ipv6* is set, and are then interleaved with the IPv4 ones, so that
+        the connection attempts alternate between the two families.
+        """
+        now = time.monotonic()
+
+        def has_failed(address: Tuple[str, int]) -> bool:
+            failed_at = self.failures.get(address)
+            return failed_at is not None and now - failed_at < self.FAILURE_TTL
+
+        def rank(option: DcOption):
+            address = option[1], option[2]
+            latency = self.latencies.get(address)
+
+            return (
+                has_failed(address),
+                # Media DCs prefer the media-only addresses
+                not option[5],
+                # Static addresses are the ones meant to be used through proxies
+                proxied and not option[8],
+                latency is None,
+                latency or 0,
+            )
+
+        options = sorted(
+            (
+                o for o in self.options
+                if o[0] == dc_id and o[3] == test_mode and (ipv6 or not o[4])
+                and (media or not o[5])
+                # Obfuscated-only addresses don't accept the other transports
+                and not o[6]
+            ),
+            key=rank
+        )
+
+        addresses = [(o[1], o[2]) for o in options]
+
+        for is_ipv6 in ((True, False) if ipv6 else (False,)):
+            try:
+                addresses.append(DataCenter(dc_id, test_mode, is_ipv6, media))
+            except KeyError:
+                pass
+
+        # The hardcoded addresses come last, unless the others have just failed
+        addresses = sorted(dict.fromkeys(addresses), key=has_failed)
+
+        if not ipv6:
+            return addresses
+
+        v6 = [a for a in addresses if ":" in a[0]]
+        v4 = [a for a in addresses if ":" not in a[0]]
+
+        if addresses and ":" not in addresses[0][0]:
+            v6, v4 = v4, v6
+
+        interleaved = []
+
+        for i in range(max(len(v6), len(v4))):
+            interleaved += v6[i:i + 1] + v4[i:i + 1]
+
+        return interleaved
@@ -19,7 +19,7 @@
 from pyrogram.raw.core import Message, MsgContainer, TLObject
 from pyrogram.raw.functions import Ping
 from pyrogram.raw.types import MsgsAck, HttpWait
-from .msg_id import MsgId
+from .msg_id import MsgIdGenerator
 from .seq_no import SeqNo
 
 not_content_related = (Ping, HttpWait, MsgsAck, MsgContainer)
@@ -28,11 +28,13 @@ not_content_related = (Ping, HttpWait, MsgsAck, MsgContainer)
 class MsgFactory:
     def __init__(self):
         self.seq_no = SeqNo()
+        self.msg_id = MsgIdGenerator()
 
-    def __call__(self, body: TLObject) -> Message:
+    def __call__(self, body: TLObject, data: bytes = None) -> Message:
         return Message(
             body,
-            MsgId(),
+            self.msg_id(),
             self.seq_no(not isinstance(body, not_content_related)),
-            len(body)
+            len(body) if data is None else len(data),
+            data
         )
@@ -33,3 +33,49 @@ class MsgId:
         cls.last_time = now
 
         return msg_id
+
+
+class MsgIdGenerator:
+    """Generate the msg_ids of a single session.
+
+    msg_ids follow the server time: the offset between the local clock and the server one is learned from the msg_id
+    of server messages, when a new session is created or the server rejects a msg_id as too low or too high (error
+    codes 16 and 17). The msg_ids generated are strictly increasing, however fast they are requested.
+    """
+
+    # How far ahead of the server time msg_ids may get, the server rejects them beyond 30 seconds
+    MAX_AHEAD = 25
+
+    def __init__(self):
+        self.time_offset = 0.0
+        self.last_msg_id = 0
+
+    def __call__(self) -> int:
+        # Client msg_ids are divisible by 4
+        msg_id = self.now() & ~3
+
+        if msg_id <= self.last_msg_id:
+            msg_id = self.last_msg_id + 4
+
+        self.last_msg_id = msg_id
+
+        return msg_id
+
+    def now(self) -> int:
+        """The current server time, as a msg_id."""
+        return int((time.time() + self.time_offset) * 2 ** 32)
+
+    def set_server_time(self, server_msg_id: int) -> bool:
+        """Learn the server time from the msg_id of a server message.
+
+        Returns True when the msg_ids already generated are too far ahead of the server time for the next ones to be
+        accepted, which only a new session fixes: msg_ids never go back within a session.
+        """
+        time_offset = server_msg_id / 2 ** 32 - time.time()
+
+        if abs(time_offset - self.time_offset) >= 1:
+            log.info("Server time offset: %.3f s", time_offset)
+
+        self.time_offset = time_offset
+
+        return self.last_msg_id - self.now() > self.MAX_AHEAD * 2 ** 32
@@ -0,0 +1,74 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+from collections import OrderedDict, deque
+
+
+class RequestLimiter:
+    """Limit the amount of requests in flight on a session.
+
+    Callers waiting for a slot are queued by key (the request name) and freed slots are handed out round-robin across
+    keys, so that a burst of slow requests of one kind can't hold back requests of other kinds queued after them.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.in_flight = 0
+        self.waiters = OrderedDict()
+
+    async def acquire(self, key: str):
+        if self.in_flight < self.size and not self.waiters:
+            self.in_flight += 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.setdefault(key, deque()).append(waiter)
+
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over right before the cancellation
+                self.release()
+            else:
+                queue = self.waiters.get(key)
+
+                if queue is not None and waiter in queue:
+                    queue.remove(waiter)
+
+                    if not queue:
+                        del self.waiters[key]
+
+            raise
+
+    def release(self):
+        while self.waiters:
+            key, queue = self.waiters.popitem(last=False)
+            waiter = queue.popleft()
+
+            # Keys with waiters left go to the back of the line
+            if queue:
+                self.waiters[key] = queue
+
+            if not waiter.done():
+                # The slot goes straight to the waiter, the amount in flight is unchanged
+                waiter.set_result(None)
+                return
+
+        self.in_flight -= 1
@@ -0,0 +1,54 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+from typing import Optional
+
+
+class StoredMsgIds:
+    """The msg_ids received in a session, used to reject replayed and too old messages.
+
+    Lookups use a set and the lowest stored msg_id is tracked as it changes, so both checks are O(1). Once more than
+    ``max_size`` msg_ids are stored, the lowest half is dropped (sorting once every ``max_size // 2`` additions).
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.msg_ids = set()
+        self.lowest: Optional[int] = None
+
+    def __len__(self) -> int:
+        return len(self.msg_ids)
+
+    def __contains__(self, msg_id: int) -> bool:
+        return msg_id in self.msg_ids
+
+    def add(self, msg_id: int):
+        self.msg_ids.add(msg_id)
+
+        if self.lowest is None or msg_id < self.lowest:
+            self.lowest = msg_id
+
+        if len(self.msg_ids) > self.max_size:
+            kept = sorted(self.msg_ids)[self.max_size // 2:]
+
+            self.msg_ids = set(kept)
+            self.lowest = kept[0]
+
+    def clear(self):
+        self.msg_ids.clear()
+        self.lowest = None
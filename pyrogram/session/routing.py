@@ -0,0 +1,204 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import annotations
+
+import asyncio
+import logging
+
+import pyrogram
+from pyrogram import raw
+from pyrogram.errors import AuthKeyDuplicated
+from pyrogram.raw.core import TLObject
+
+from .session import Session
+
+log = logging.getLogger(__name__)
+
+
+def get_query_name(query: TLObject) -> str:
+    if isinstance(query, (raw.functions.InvokeWithoutUpdates, raw.functions.InvokeWithTakeout)):
+        query = query.query
+
+    return ".".join(query.QUALNAME.split(".")[1:])
+
+
+class RoutingPolicy:
+    """Pick the session of a :obj:`RequestRouter` a request is sent through.
+
+    The first of the sessions passed in is the main one, which also receives updates.
+    """
+
+    def select(self, sessions: list[Session], query: TLObject) -> Session:
+        raise NotImplementedError
+
+
+class RoundRobin(RoutingPolicy):
+    """Send requests through each session in turn."""
+
+    def __init__(self):
+        self.index = 0
+
+    def select(self, sessions: list[Session], query: TLObject) -> Session:
+        session = sessions[self.index % len(sessions)]
+        self.index += 1
+
+        return session
+
+
+class LeastInFlight(RoutingPolicy):
+    """Send requests through the session with the fewest requests awaiting an answer, the main one on ties."""
+
+    def select(self, sessions: list[Session], query: TLObject) -> Session:
+        return min(sessions, key=lambda session: session.limiter.in_flight)
+
+
+class Lanes(RoutingPolicy):
+    """Keep the main session for interactive requests and send bulk ones through the others.
+
+    Parameters:
+        bulk (``Iterable[str]``, *optional*):
+            Names of the requests considered bulk (e.g.: "messages.GetHistory").
+            Defaults to history, search, participants and file requests.
+    """
+
+    BULK = frozenset({
+        "messages.GetHistory",
+        "messages.GetReplies",
+        "messages.Search",
+        "messages.SearchGlobal",
+        "messages.GetDialogs",
+        "channels.GetParticipants",
+        "contacts.GetContacts",
+        "upload.GetFile",
+        "upload.SaveFilePart",
+        "upload.SaveBigFilePart",
+    })
+
+    def __init__(self, bulk=None):
+        self.bulk = self.BULK if bulk is None else frozenset(bulk)
+        self.least_in_flight = LeastInFlight()
+
+    def select(self, sessions: list[Session], query: TLObject) -> Session:
+        if len(sessions) > 1 and get_query_name(query) in self.bulk:
+            return self.least_in_flight.select(sessions[1:], query)
+
+        return sessions[0]
+
+
+class RequestRouter:
+    """Spread the requests of a client over several connections to its home DC.
+
+    The main session (:attr:`Client.session`) is the only one receiving updates. The other sessions share its
+    auth key, are opened the first time a request is routed and stay open until the client is terminated. Requests
+    sent through them are wrapped in invokeWithoutUpdates by the client.
+
+    Sessions not connected within :attr:`START_TIMEOUT` keep connecting in the background and only join the rotation
+    once started.
+    """
+
+    START_TIMEOUT = 10
+
+    def __init__(self, client: pyrogram.Client, size: int, policy: RoutingPolicy = None):
+        self.client = client
+        self.size = max(1, size)
+        self.policy = policy or LeastInFlight()
+
+        self.sessions: list[Session] = []
+        self.connect_tasks: set[asyncio.Task] = set()
+        self.is_started = False
+
+        self.lock = asyncio.Lock()
+
+    async def get(self, query: TLObject) -> Session:
+        if not self.is_started:
+            await self.start()
+
+        # Skip sessions that are reconnecting
+        sessions = [self.client.session, *(s for s in self.sessions if s.is_started.is_set())]
+
+        return self.policy.select(sessions, query)
+
+    async def start(self):
+        async with self.lock:
+            if self.is_started:
+                return
+
+            dc_id = await self.client.storage.dc_id()
+            auth_key = await self.client.storage.auth_key()
+            test_mode = await self.client.storage.test_mode()
+
+            self.connect_tasks = {
+                self.client.loop.create_task(
+                    self.connect(Session(self.client, dc_id, auth_key, test_mode, no_updates=True))
+                )
+                for _ in range(self.size - 1)
+            }
+
+            await asyncio.wait(self.connect_tasks, timeout=self.START_TIMEOUT)
+
+            if not self.sessions:
+                await self.cancel_connect_tasks()
+
+                raise ConnectionError(f"Unable to open any new session to DC{dc_id}")
+
+            self.is_started = True
+
+    async def connect(self, session: Session):
+        attempts = 0
+
+        while True:
+            try:
+                await session.start()
+            except AuthKeyDuplicated as e:
+                log.warning("Unable to open a new session to DC%s: %s", session.dc_id, e)
+                return
+            except asyncio.CancelledError:
+                await session.stop()
+                raise
+            except Exception as e:
+                delay = min(Session.RECONNECT_MAX_DELAY, Session.RECONNECT_BASE_DELAY * 2 ** attempts)
+                attempts += 1
+
+                log.warning(
+                    "Unable to open a new session to DC%s, retrying in %.1f seconds: %s", session.dc_id, delay, e
+                )
+                await asyncio.sleep(delay)
+            else:
+                break
+
+        # Joins the rotation only once it can take requests
+        self.sessions.append(session)
+
+    async def cancel_connect_tasks(self):
+        for task in self.connect_tasks:
+            task.cancel()
+
+        await asyncio.gather(*self.connect_tasks, return_exceptions=True)
+
+        self.connect_tasks.clear()
+
+    async def stop(self):
+        async with self.lock:
+            await self.cancel_connect_tasks()
+
+            for session in self.sessions:
+                await session.stop()
+
+            self.sessions.clear()
+            self.is_started = False
@@ -19,18 +19,18 @@
 from __future__ import annotations
 
 import asyncio
-import bisect
 import contextlib
 import logging
 import os
+import random
+from collections import deque
 from datetime import datetime, timedelta
 from hashlib import sha1
-from io import BytesIO
 from typing import ClassVar
 
 import pyrogram
 from pyrogram import raw
-from pyrogram.crypto import mtproto
+from pyrogram.crypto import executor as crypto_executor, mtproto
 from pyrogram.errors import (
     FloodPremiumWait,
     AuthKeyDuplicated,
@@ -42,18 +42,44 @@ from pyrogram.errors import (
     ServiceUnavailable,
 )
 from pyrogram.raw.all import layer
-from pyrogram.raw.core import FutureSalts, Int, MsgContainer, TLObject
+from pyrogram.raw.core import FutureSalt, FutureSalts, Int, Message, MsgContainer, TLObject, TLReader
 
-from .internals import MsgFactory, MsgId
+from .internals import MsgFactory, RequestLimiter, StoredMsgIds
 from pyrogram.connection import Connection
 
 log = logging.getLogger(__name__)
 
+# MTProto service functions, which are never wrapped in initConnection
+service_functions = (
+    raw.functions.Ping,
+    raw.functions.PingDelayDisconnect,
+    raw.functions.GetFutureSalts,
+    raw.functions.RpcDropAnswer,
+    raw.functions.DestroySession,
+)
+
+
+def unpack_packets(packets: list, session_id: bytes, auth_key: bytes, auth_key_id: bytes) -> list:
+    # Packets that can't be unpacked are returned as the exception they raised
+    unpacked = []
+
+    for packet in packets:
+        try:
+            unpacked.append(mtproto.unpack(packet, session_id, auth_key, auth_key_id))
+        except Exception as e:
+            unpacked.append(e)
+
+    return unpacked
+
 
 class Result:
-    def __init__(self):
+    def __init__(self, msg_id: int):
+        # The msg_id the answer is expected for, which changes when the message is sent again
+        self.msg_id = msg_id
         self.value = None
         self.event = asyncio.Event()
+        # The message once sent, to send it again if the connection is lost before the answer arrives
+        self.message = None
 
 
 class Session:
@@ -62,9 +88,31 @@ class Session:
     SLEEP_THRESHOLD = 10
     MAX_RETRIES = 10
     ACKS_THRESHOLD = 10
-    PING_INTERVAL = 5
+    # The connection is pinged after KEEPALIVE_INTERVAL seconds without receiving anything, or when requests go
+    # unanswered for longer than the usual round trip
+    KEEPALIVE_INTERVAL = 30
+    PING_DISCONNECT_DELAY = 75
+    # Pongs are not expected sooner than this, whatever the round trip measured on an idle connection
+    MIN_PING_TIMEOUT = 2
+    # Slowest uplink a ping is expected to drain at, when queued behind data that is still being sent (bytes/s)
+    MIN_UPLINK_RATE = 16 * 1024
+    FUTURE_SALTS_COUNT = 32
+    FUTURE_SALTS_RETRY_DELAY = 60
+    # Future salts are asked again this many seconds before the last one known expires
+    FUTURE_SALTS_REFRESH_MARGIN = 60 * 60
+    # Salts are switched this many seconds before they expire
+    SALT_EXPIRY_MARGIN = 60
     STORED_MSG_IDS_MAX_SIZE = 1000 * 2
+    SEND_BATCH_DELAY = 0
+    CONTAINER_MAX_MESSAGES = 100
+    CONTAINER_MAX_SIZE = 64 * 1024
+    RECV_QUEUE_SIZE = 64
+    RECV_BATCH_SIZE = 16
+    UPDATES_QUEUE_SIZE = 4096
     RECONNECT_THRESHOLD = timedelta(seconds=10)
+    # Reconnections closer than the threshold wait for an exponential delay, with jitter
+    RECONNECT_BASE_DELAY = 0.5
+    RECONNECT_MAX_DELAY = 10
 
     TRANSPORT_ERRORS: ClassVar = {
         404: "auth key not found",
@@ -80,6 +128,7 @@ class Session:
         test_mode: bool,
         is_media: bool = False,
         is_cdn: bool = False,
+        no_updates: bool = False,
     ):
         self.client = client
         self.dc_id = dc_id
@@ -87,6 +136,7 @@ class Session:
         self.test_mode = test_mode
         self.is_media = is_media
         self.is_cdn = is_cdn
+        self.no_updates = no_updates
 
         self.connection: Connection | None = None
 
@@ -97,23 +147,71 @@ class Session:
 
         self.salt = 0
 
+        # Known salts, ordered by validity, the first one being in use
+        self.future_salts: deque[FutureSalt] = deque()
+        self.salt_task = None
+        self.salt_task_event = asyncio.Event()
+
         self.pending_acks = set()
 
         self.results = {}
 
-        self.stored_msg_ids = []
+        # Caps the requests awaiting an answer, handing free slots fairly across the kinds of requests waiting
+        self.limiter = RequestLimiter(client.max_concurrent_requests)
+
+        self.send_queue = deque()
+        self.send_event = asyncio.Event()
+        self.send_task = None
+
+        # Container msg_id -> msg_ids of the messages inside it
+        self.containers = {}
+
+        self.stored_msg_ids = StoredMsgIds(Session.STORED_MSG_IDS_MAX_SIZE)
 
         self.ping_task = None
         self.ping_task_event = asyncio.Event()
+        # Wakes the ping worker up before the check it sleeps until, when something earlier has to be checked
+        self.ping_wakeup = asyncio.Event()
+        self.ping_check_at = 0
+
+        self.ping_id = None
+        self.ping_sent_at = None
+        self.last_ping_time = 0
+        self.last_send_time = 0
+        self.last_recv_time = 0
+        # Bytes sent over the connection when the last packet was received, and when the ping was sent
+        self.last_recv_bytes_sent = 0
+        self.ping_bytes_ahead = 0
+
+        # Smoothed round trip time and its variation, measured from pongs
+        self.srtt = None
+        self.rttvar = None
 
         self.recv_task = None
 
+        # Received packets wait here to be decrypted and handled in order. The queue is bounded, so the
+        # socket stops being read when handling falls behind
+        self.recv_queue = asyncio.Queue(Session.RECV_QUEUE_SIZE)
+        self.packet_task = None
+
+        # Updates are handled one at a time and in order, by a task of their own. Their queue must never
+        # block handling packets, which carry the results that update handlers themselves may be waiting
+        # for (e.g.: updates.GetDifference): once full, updates are dropped instead and the client gets
+        # the difference when there is room again
+        self.updates_queue = asyncio.Queue(Session.UPDATES_QUEUE_SIZE)
+        self.updates_task = None
+        self.updates_dropped = 0
+
         self.is_started = asyncio.Event()
         self.restart_lock = asyncio.Lock()
 
         self.last_reconnect_attempt = None
+        self.reconnect_attempts = 0
 
-    async def start(self):
+        # Set when a session is resumed, the first query sent afterwards is then wrapped in initConnection
+        self.init_connection_pending = False
+
+    async def start(self, resume: bool = False):
         while True:
             self.connection = self.client.connection_factory(
                 dc_id=self.dc_id,
@@ -122,35 +220,47 @@ class Session:
                 proxy=self.client.proxy,
                 media=self.is_media,
                 protocol_factory=self.client.protocol_factory,
+                socket_options=(
+                    self.client.media_socket_options if self.is_media else self.client.socket_options
+                ),
+                dc_options=self.client.dc_options,
             )
 
             try:
                 await self.connection.connect()
 
+                self.ping_sent_at = None
+                self.last_ping_time = self.last_send_time = self.last_recv_time = self.client.loop.time()
+                self.last_recv_bytes_sent = 0
+
                 self.recv_task = self.client.loop.create_task(self.recv_worker())
+                self.packet_task = self.client.loop.create_task(self.packet_worker())
+
+                if self.updates_task is None:
+                    self.updates_task = self.client.loop.create_task(self.updates_worker())
+                self.send_task = self.client.loop.create_task(self.send_worker())
+
+                if resume:
+                    # The session goes on over the new connection: requests still waiting for an answer are sent
+                    # again and the connection is initialized along with the first query, without round trips
+                    self.resend_pending()
+                    self.init_connection_pending = not self.is_cdn
+                else:
+                    await self.send(raw.functions.Ping(ping_id=0), timeout=self.START_TIMEOUT)
+
+                    if not self.is_cdn:
+                        config = await self.send(
+                            await self.init_connection(raw.functions.help.GetConfig()),
+                            timeout=self.START_TIMEOUT,
+                        )
 
-                await self.send(raw.functions.Ping(ping_id=0), timeout=self.START_TIMEOUT)
-
-                if not self.is_cdn:
-                    await self.send(
-                        raw.functions.InvokeWithLayer(
-                            layer=layer,
-                            query=raw.functions.InitConnection(
-                                api_id=await self.client.storage.api_id(),
-                                app_version=self.client.app_version,
-                                device_model=self.client.device_model,
-                                system_version=self.client.system_version,
-                                system_lang_code=self.client.lang_code,
-                                lang_code=self.client.lang_code,
-                                lang_pack="",
-                                query=raw.functions.help.GetConfig(),
-                            ),
-                        ),
-                        timeout=self.START_TIMEOUT,
-                    )
+                        await self.update_dc_options(config)
 
                 self.ping_task = self.client.loop.create_task(self.ping_worker())
 
+                if not self.is_cdn:
+                    self.salt_task = self.client.loop.create_task(self.salt_worker())
+
                 log.info("Session initialized: Layer %s", layer)
                 log.info("Device: %s - %s", self.client.device_model, self.client.app_version)
                 log.info("System: %s (%s)", self.client.system_version, self.client.lang_code)
@@ -158,7 +268,7 @@ class Session:
                 await self.stop()
                 raise e
             except (OSError, RPCError):
-                await self.stop()
+                await self.stop(restart=resume)
             except Exception as e:
                 await self.stop()
                 raise e
@@ -169,21 +279,49 @@ class Session:
 
         log.info("Session started")
 
-    async def stop(self):
+    async def stop(self, restart: bool = False):
         self.is_started.clear()
 
-        self.stored_msg_ids.clear()
+        # The session is the same when restarting, so are the msg_ids already received
+        if not restart:
+            self.stored_msg_ids.clear()
 
         self.ping_task_event.set()
+        self.ping_wakeup.set()
 
         if self.ping_task is not None:
             await self.ping_task
 
         self.ping_task_event.clear()
 
+        if self.salt_task:
+            self.salt_task.cancel()
+
+            with contextlib.suppress(asyncio.CancelledError):
+                await self.salt_task
+
+            self.salt_task = None
+
         if self.connection:
             await self.connection.close()
 
+        if self.send_task:
+            self.send_task.cancel()
+
+            with contextlib.suppress(asyncio.CancelledError):
+                await self.send_task
+
+            self.send_task = None
+
+        # Messages not sent yet wait for the new connection when restarting
+        while self.send_queue and not restart:
+            _, sent = self.send_queue.popleft()
+
+            if not sent.done():
+                sent.set_exception(ConnectionError("The session has been stopped"))
+
+        self.containers.clear()
+
         if self.recv_task and not self.recv_task.done():
             self.recv_task.cancel()
 
@@ -192,7 +330,32 @@ class Session:
 
             self.recv_task = None
 
-        if not self.is_media and callable(self.client.disconnect_handler):
+        if self.packet_task:
+            self.packet_task.cancel()
+
+            with contextlib.suppress(asyncio.CancelledError):
+                await self.packet_task
+
+            self.packet_task = None
+
+        while not self.recv_queue.empty():
+            self.recv_queue.get_nowait()
+
+        # Updates already received are still handled when the session is just restarting
+        if self.updates_task and not restart:
+            self.updates_task.cancel()
+
+            with contextlib.suppress(asyncio.CancelledError):
+                await self.updates_task
+
+            self.updates_task = None
+
+            while not self.updates_queue.empty():
+                self.updates_queue.get_nowait()
+
+            self.updates_dropped = 0
+
+        if not (self.is_media or self.no_updates) and callable(self.client.disconnect_handler):
             try:
                 await self.client.disconnect_handler(self.client)
             except Exception as e:
@@ -201,29 +364,141 @@ class Session:
         log.info("Session stopped")
 
     async def restart(self):
+        connection = self.connection
+
         async with self.restart_lock:
+            # Someone else already reconnected while this was waiting
+            if self.connection is not connection and self.is_started.is_set():
+                return
+
             now = datetime.now()
             if (
                 self.last_reconnect_attempt
                 and now - self.last_reconnect_attempt < self.RECONNECT_THRESHOLD
             ):
-                log.info("Reconnecting too frequently, sleeping for a while")
-                await asyncio.sleep(5)
+                delay = min(self.RECONNECT_MAX_DELAY, self.RECONNECT_BASE_DELAY * 2 ** self.reconnect_attempts)
+                delay *= random.uniform(0.5, 1)
+                self.reconnect_attempts += 1
+
+                log.info("Reconnecting too frequently, sleeping for %.1f seconds", delay)
+                await asyncio.sleep(delay)
+            else:
+                self.reconnect_attempts = 0
 
             self.last_reconnect_attempt = now
-            await self.stop()
-            await self.start()
-
-    async def handle_packet(self, packet):
-        data = await self.client.loop.run_in_executor(
-            pyrogram.crypto_executor,
-            mtproto.unpack,
-            BytesIO(packet),
+            await self.stop(restart=True)
+            await self.start(resume=True)
+
+    async def update_dc_options(self, config: raw.types.Config) -> None:
+        dc_options = self.client.dc_options.update(config)
+
+        if dc_options is None:
+            return
+
+        try:
+            await self.client.storage.update_dc_options(dc_options)
+        except NotImplementedError:
+            # Custom storages may not keep the DC addresses, they are then only known until the client stops
+            pass
+
+    async def init_connection(self, query: TLObject) -> TLObject:
+        return raw.functions.InvokeWithLayer(
+            layer=layer,
+            query=raw.functions.InitConnection(
+                api_id=await self.client.storage.api_id(),
+                app_version=self.client.app_version,
+                device_model=self.client.device_model,
+                system_version=self.client.system_version,
+                system_lang_code=self.client.lang_code,
+                lang_code=self.client.lang_code,
+                lang_pack="",
+                query=query,
+            ),
+        )
+
+    def resend_pending(self):
+        # The original msg_ids may be too old by now, or wrong after the server time was corrected, so the messages
+        # get new ones and their pending results follow them
+        pending = sorted(
+            (r for r in self.results.values() if r.message is not None and not r.event.is_set()),
+            key=lambda r: r.msg_id
+        )
+        queued = []
+
+        for result in pending:
+            message = self.msg_factory(result.message.body, result.message.data)
+
+            del self.results[result.msg_id]
+            result.msg_id = message.msg_id
+            result.message = None
+            self.results[message.msg_id] = result
+
+            sent = self.client.loop.create_future()
+            sent.add_done_callback(lambda f: f.cancelled() or f.exception())
+
+            queued.append((message, sent))
+
+        # Ahead of everything else, in their original order
+        self.send_queue.extendleft(reversed(queued))
+
+        if queued:
+            log.info("Sending %s pending messages again", len(queued))
+            self.send_event.set()
+
+    def set_server_time(self, server_msg_id: int):
+        if self.msg_factory.msg_id.set_server_time(server_msg_id):
+            self.new_session()
+
+    def new_session(self):
+        # The local clock went back so far that msg_ids, which only increase within a session, would stay ahead of the
+        # server time: a new session starts over from the right time and everything not answered yet is sent in it
+        log.info("Starting a new session, msg_ids are too far ahead of the server time")
+
+        time_offset = self.msg_factory.msg_id.time_offset
+
+        self.session_id = os.urandom(8)
+        self.msg_factory = MsgFactory()
+        self.msg_factory.msg_id.time_offset = time_offset
+
+        self.stored_msg_ids.clear()
+        self.pending_acks.clear()
+
+        # Messages still queued were numbered by the old session
+        queued = list(self.send_queue)
+        self.send_queue.clear()
+
+        for message, sent in queued:
+            renumbered = self.msg_factory(message.body, message.data)
+            result = self.results.pop(message.msg_id, None)
+
+            if result is not None:
+                result.msg_id = renumbered.msg_id
+                self.results[renumbered.msg_id] = result
+
+            self.send_queue.append((renumbered, sent))
+
+        self.resend_pending()
+        self.init_connection_pending = not self.is_cdn
+
+    async def handle_packets(self, packets: list):
+        # A burst of packets is decrypted and decoded with a single executor hop
+        unpacked = await crypto_executor.run(
+            unpack_packets,
+            packets,
             self.session_id,
             self.auth_key,
             self.auth_key_id,
+            size=sum(len(packet) for packet in packets),
         )
 
+        for data in unpacked:
+            if isinstance(data, Exception):
+                log.warning("Discarding packet: %s", data)
+                continue
+
+            await self.handle_message(data)
+
+    async def handle_message(self, data: Message):
         messages = data.body.messages if isinstance(data.body, MsgContainer) else [data]
 
         log.debug("Received: %s", data)
@@ -235,11 +510,8 @@ class Session:
                 self.pending_acks.add(msg.msg_id)
 
             try:
-                if len(self.stored_msg_ids) > Session.STORED_MSG_IDS_MAX_SIZE:
-                    del self.stored_msg_ids[: Session.STORED_MSG_IDS_MAX_SIZE // 2]
-
                 if self.stored_msg_ids:
-                    if msg.msg_id < self.stored_msg_ids[0]:
+                    if msg.msg_id < self.stored_msg_ids.lowest:
                         raise SecurityCheckMismatch(
                             "The msg_id is lower than all the stored values"
                         )
@@ -249,7 +521,7 @@ class Session:
                             "The msg_id is equal to any of the stored values"
                         )
 
-                    time_diff = (msg.msg_id - MsgId()) / 2**32
+                    time_diff = (msg.msg_id - self.msg_factory.msg_id.now()) / 2**32
 
                     if time_diff > 30:
                         raise SecurityCheckMismatch(
@@ -271,15 +543,20 @@ class Session:
                 await self.connection.close()
                 return
             else:
-                bisect.insort(self.stored_msg_ids, msg.msg_id)
+                self.stored_msg_ids.add(msg.msg_id)
 
             if isinstance(msg.body, (raw.types.MsgDetailedInfo, raw.types.MsgNewDetailedInfo)):
                 self.pending_acks.add(msg.body.answer_msg_id)
                 continue
 
             if isinstance(msg.body, raw.types.NewSessionCreated):
+                self.set_server_time(msg.msg_id)
                 continue
 
+            # msg_id too low or too high: the server time is learned before the messages are sent again
+            if isinstance(msg.body, raw.types.BadMsgNotification) and msg.body.error_code in (16, 17):
+                self.set_server_time(msg.msg_id)
+
             msg_id = None
 
             if isinstance(msg.body, (raw.types.BadMsgNotification, raw.types.BadServerSalt)):
@@ -288,44 +565,155 @@ class Session:
                 msg_id = msg.body.req_msg_id
             elif isinstance(msg.body, raw.types.Pong):
                 msg_id = msg.body.msg_id
-            elif self.client is not None:
-                self.client.loop.create_task(self.client.handle_updates(msg.body))
 
-            if msg_id in self.results:
-                self.results[msg_id].value = getattr(msg.body, "result", msg.body)
-                self.results[msg_id].event.set()
+                if msg.body.ping_id == self.ping_id and self.ping_sent_at is not None:
+                    self.update_rtt(self.client.loop.time() - self.ping_sent_at)
+                    self.ping_sent_at = None
+                    # The worker slept until the pong deadline, the keepalive is now checked instead
+                    self.ping_wakeup.set()
+            elif self.client is not None and not self.no_updates:
+                self.queue_updates(msg.body)
 
-        if len(self.pending_acks) >= self.ACKS_THRESHOLD:
-            log.debug("Sending %s acks", len(self.pending_acks))
+            # Notifications about a whole container are delivered to every message inside it
+            for msg_id in self.containers.pop(msg_id, (msg_id,)):
+                if msg_id in self.results:
+                    self.results[msg_id].value = getattr(msg.body, "result", msg.body)
+                    self.results[msg_id].event.set()
 
-            try:
-                await self.send(raw.types.MsgsAck(msg_ids=list(self.pending_acks)), False)
-            except OSError:
-                pass
-            else:
-                self.pending_acks.clear()
+        if len(self.pending_acks) >= self.ACKS_THRESHOLD:
+            self.send_event.set()
 
     async def ping_worker(self):
         log.info("PingTask started")
 
         while True:
-            try:
-                await asyncio.wait_for(self.ping_task_event.wait(), self.PING_INTERVAL)
-            except asyncio.TimeoutError:
-                pass
-            else:
+            # Asleep until the next check is due, rather than polling. Receiving only pushes the checks later, except
+            # for the pong, and sending wakes the worker up when a request could stall sooner
+            self.ping_wakeup.clear()
+            self.ping_check_at = self.next_ping_check()
+
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(
+                    self.ping_wakeup.wait(),
+                    max(0.0, self.ping_check_at - self.client.loop.time())
+                )
+
+            if self.ping_task_event.is_set():
                 break
 
+            now = self.client.loop.time()
+
+            if self.ping_sent_at is not None:
+                # The peer is considered dead once the pong is late compared to the usual round trip. Data sent and
+                # not yet answered may be ahead of the ping, which then needs time to drain on a slow uplink, and
+                # anything received in the meantime shows the peer is alive. Closing the connection makes the
+                # session reconnect
+                if now >= self.pong_deadline():
+                    log.warning("No pong in %.1f seconds, the connection is dead", now - self.ping_sent_at)
+
+                    self.ping_sent_at = None
+                    await self.connection.close()
+
+                continue
+
+            is_idle = now - self.last_recv_time >= self.KEEPALIVE_INTERVAL
+            is_stalled = (
+                self.results
+                and self.last_send_time > self.last_recv_time
+                and now - self.last_send_time >= self.ping_timeout()
+            )
+            # The server closes connections whose last ping is older than the disconnect delay
+            is_expiring = now - self.last_ping_time >= self.PING_DISCONNECT_DELAY - self.KEEPALIVE_INTERVAL
+
+            if not (is_idle or is_stalled or is_expiring):
+                continue
+
+            self.ping_id = random.getrandbits(63)
+            self.ping_sent_at = self.last_ping_time = now
+            self.ping_bytes_ahead = self.bytes_sent() - self.last_recv_bytes_sent
+
             with contextlib.suppress(OSError, RPCError):
                 await self.send(
                     raw.functions.PingDelayDisconnect(
-                        ping_id=0, disconnect_delay=self.WAIT_TIMEOUT + 10
+                        ping_id=self.ping_id, disconnect_delay=self.PING_DISCONNECT_DELAY
                     ),
                     False,
                 )
 
         log.info("PingTask stopped")
 
+    def next_ping_check(self) -> float:
+        if self.ping_sent_at is not None:
+            return self.pong_deadline()
+
+        check_at = min(
+            self.last_recv_time + self.KEEPALIVE_INTERVAL,
+            self.last_ping_time + self.PING_DISCONNECT_DELAY - self.KEEPALIVE_INTERVAL
+        )
+
+        if self.results and self.last_send_time > self.last_recv_time:
+            check_at = min(check_at, self.last_send_time + self.ping_timeout())
+
+        return check_at
+
+    def pong_deadline(self) -> float:
+        timeout = self.ping_timeout() + self.ping_bytes_ahead / self.MIN_UPLINK_RATE
+
+        return max(self.ping_sent_at, self.last_recv_time) + timeout
+
+    def bytes_sent(self) -> int:
+        return getattr(self.connection and self.connection.protocol, "bytes_sent", 0)
+
+    def update_rtt(self, rtt: float):
+        # https://www.rfc-editor.org/rfc/rfc6298
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            self.rttvar = 0.75 * self.rttvar + 0.25 * abs(self.srtt - rtt)
+            self.srtt = 0.875 * self.srtt + 0.125 * rtt
+
+    def ping_timeout(self) -> float:
+        if self.srtt is None:
+            return self.WAIT_TIMEOUT
+
+        return min(self.WAIT_TIMEOUT, max(self.MIN_PING_TIMEOUT, self.srtt + 4 * self.rttvar))
+
+    async def salt_worker(self):
+        # Salts are switched proactively, before the server has to reject messages sent with an expired one
+        while True:
+            try:
+                future_salts = await self.send(raw.functions.GetFutureSalts(num=self.FUTURE_SALTS_COUNT))
+            except (OSError, RPCError) as e:
+                log.warning("Unable to get future salts: %s", e)
+                delay = self.FUTURE_SALTS_RETRY_DELAY
+            else:
+                self.future_salts = deque(sorted(future_salts.salts, key=lambda s: s.valid_since))
+                self.rotate_salt()
+
+                delay = max(
+                    self.FUTURE_SALTS_RETRY_DELAY,
+                    self.future_salts[-1].valid_until - future_salts.now - self.FUTURE_SALTS_REFRESH_MARGIN
+                ) if self.future_salts else self.FUTURE_SALTS_RETRY_DELAY
+
+            self.salt_task_event.clear()
+
+            # Woken up early when the server rejects the salt in use
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self.salt_task_event.wait(), delay)
+
+    def rotate_salt(self):
+        if not self.future_salts:
+            return
+
+        now = self.msg_factory.msg_id.now() >> 32
+
+        while len(self.future_salts) > 1 and self.future_salts[0].valid_until <= now + self.SALT_EXPIRY_MARGIN:
+            self.future_salts.popleft()
+
+        if self.future_salts[0].valid_since <= now:
+            self.salt = self.future_salts[0].salt
+
     async def recv_worker(self):
         log.info("NetworkTask started")
 
@@ -334,7 +722,7 @@ class Session:
 
             if packet is None or len(packet) == 4:
                 if packet:
-                    error_code = -Int.read(BytesIO(packet))
+                    error_code = -Int.read(TLReader(packet))
 
                     log.warning(
                         "Server sent transport error: %s (%s)",
@@ -347,71 +735,278 @@ class Session:
 
                 break
 
-            self.client.loop.create_task(self.handle_packet(packet))
+            self.last_recv_time = self.client.loop.time()
+            self.last_recv_bytes_sent = self.bytes_sent()
+
+            await self.recv_queue.put(packet)
 
         log.info("NetworkTask stopped")
 
-    async def send(
-        self, data: TLObject, wait_response: bool = True, timeout: float = WAIT_TIMEOUT
-    ):
-        message = self.msg_factory(data)
-        msg_id = message.msg_id
+    async def packet_worker(self):
+        while True:
+            packets = [await self.recv_queue.get()]
 
-        if wait_response:
-            self.results[msg_id] = Result()
+            while len(packets) < self.RECV_BATCH_SIZE and not self.recv_queue.empty():
+                packets.append(self.recv_queue.get_nowait())
 
-        log.debug("Sent: %s", message)
+            try:
+                await self.handle_packets(packets)
+            except Exception as e:
+                log.exception(e)
 
-        payload = await self.client.loop.run_in_executor(
-            pyrogram.crypto_executor,
-            mtproto.pack,
-            message,
-            self.salt,
-            self.session_id,
-            self.auth_key,
-            self.auth_key_id,
-        )
+    def queue_updates(self, updates: TLObject):
+        if self.updates_dropped and not self.updates_queue.full():
+            log.warning("Dropped %s updates, getting the difference", self.updates_dropped)
+
+            # The same as the server does when there are too many updates to send. These updates are
+            # part of the difference too
+            self.updates_queue.put_nowait(raw.types.UpdatesTooLong())
+            self.updates_dropped = 0
+            return
+
+        if self.updates_queue.full():
+            if not self.updates_dropped:
+                log.warning("Updates are handled too slowly, dropping them until they catch up")
+
+            self.updates_dropped += 1
+            return
+
+        self.updates_queue.put_nowait(updates)
+
+    async def updates_worker(self):
+        while True:
+            updates = await self.updates_queue.get()
+
+            try:
+                await self.client.handle_updates(updates)
+            except Exception as e:
+                log.exception(e)
+
+    async def send_worker(self):
+        log.info("SendTask started")
+
+        while True:
+            await self.send_event.wait()
+            self.send_event.clear()
+
+            # Let the requests issued in the meantime join the same container
+            await asyncio.sleep(self.SEND_BATCH_DELAY)
+
+            while self.send_queue or len(self.pending_acks) >= self.ACKS_THRESHOLD:
+                try:
+                    await self.send_batch()
+                except OSError:
+                    # The connection is gone: leave the rest to the next send or to the restart
+                    break
+                except Exception:
+                    # Already handed to the callers whose messages were in the batch
+                    pass
+
+    async def send_batch(self):
+        messages = []
+        pending = []
+        size = 0
+
+        while self.send_queue and len(messages) < self.CONTAINER_MAX_MESSAGES:
+            message, sent = self.send_queue[0]
+
+            if messages and size + message.byte_size() > self.CONTAINER_MAX_SIZE:
+                break
+
+            self.send_queue.popleft()
+
+            # The caller went away while the message was queued
+            if sent.done():
+                continue
+
+            messages.append(message)
+            pending.append((message, sent))
+            size += message.byte_size()
+
+        acks = list(self.pending_acks)
+        self.pending_acks.clear()
+
+        if acks:
+            log.debug("Sending %s acks", len(acks))
+            messages.append(self.msg_factory(raw.types.MsgsAck(msg_ids=acks)))
+
+        if not messages:
+            return
+
+        if len(messages) == 1:
+            message = messages[0]
+        else:
+            message = self.msg_factory(MsgContainer(messages))
+            self.containers[message.msg_id] = [m.msg_id for m in messages]
+
+            if len(self.containers) > self.STORED_MSG_IDS_MAX_SIZE:
+                for msg_id in list(self.containers)[:self.STORED_MSG_IDS_MAX_SIZE // 2]:
+                    del self.containers[msg_id]
+
+        self.rotate_salt()
 
         try:
+            payload = await crypto_executor.run(
+                mtproto.pack,
+                message,
+                self.salt,
+                self.session_id,
+                self.auth_key,
+                self.auth_key_id,
+                size=message.length,
+            )
+
             await self.connection.send(payload)
-        except OSError as e:
-            self.results.pop(msg_id, None)
-            raise e
+
+            self.last_send_time = self.client.loop.time()
+
+            # The ping worker may be asleep until after the time the requests just sent would be found stalled
+            if (
+                self.results
+                and self.ping_sent_at is None
+                and self.last_send_time + self.ping_timeout() < self.ping_check_at
+            ):
+                self.ping_wakeup.set()
+        except asyncio.CancelledError:
+            self.pending_acks.update(acks)
+
+            # Back in the queue, to be sent over the next connection or failed when the session stops
+            self.send_queue.extendleft(reversed(pending))
+
+            raise
+        except Exception as e:
+            self.pending_acks.update(acks)
+
+            for _, sent in pending:
+                if not sent.done():
+                    sent.set_exception(e)
+
+            raise
+        else:
+            log.debug("Sent: %s", message)
+
+            for message, sent in pending:
+                if message.msg_id in self.results:
+                    self.results[message.msg_id].message = message
+
+                if not sent.done():
+                    sent.set_result(None)
+
+    async def send(
+        self,
+        data: TLObject,
+        wait_response: bool = True,
+        timeout: float = WAIT_TIMEOUT,
+        serialized: bytes = None,
+    ):
+        if self.send_task is None or self.send_task.done():
+            raise ConnectionError("The session is not connected")
+
+        # Whether this query carries initConnection, which is done only once the server accepted it
+        wraps_init = False
+
+        # The body is serialized once, messages sent again after being rejected reuse it
+        if serialized is None:
+            if self.init_connection_pending and not isinstance(data, service_functions):
+                wraps_init = True
+                serialized = (await self.init_connection(data)).write()
+            else:
+                serialized = data.write()
+
+            if self.client.compression_policy is not None and not isinstance(data, service_functions):
+                serialized = self.client.compression_policy.compress(data, serialized)
+
+        message = self.msg_factory(data, serialized)
+        pending = None
 
         if wait_response:
-            with contextlib.suppress(asyncio.TimeoutError):
-                await asyncio.wait_for(self.results[msg_id].event.wait(), timeout)
+            pending = self.results[message.msg_id] = Result(message.msg_id)
 
-            result = self.results.pop(msg_id).value
+        # Messages are queued and sent by the send worker, batched in containers when possible. A message still
+        # queued when the timeout expires is given up: its future is cancelled and the send worker skips it
+        sent = self.client.loop.create_future()
+        self.send_queue.append((message, sent))
+        self.send_event.set()
 
-            if result is None:
-                raise TimeoutError("Request timed out")
+        try:
+            await asyncio.wait_for(sent, timeout)
+        except asyncio.TimeoutError:
+            if pending is not None:
+                self.results.pop(pending.msg_id, None)
+            raise TimeoutError("Request timed out") from None
+        except (Exception, asyncio.CancelledError):
+            if pending is not None:
+                self.results.pop(pending.msg_id, None)
+            raise
+
+        if not wait_response:
+            if wraps_init:
+                self.init_connection_pending = False
+
+            return None
+
+        # The msg_id is read again after waiting, the message may have been sent again with a new one meanwhile
+        try:
+            await asyncio.wait_for(pending.event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        except asyncio.CancelledError:
+            self.results.pop(pending.msg_id, None)
+            self.drop_answer(pending.msg_id)
+            raise
+
+        self.results.pop(pending.msg_id, None)
+        result = pending.value
+
+        if result is None:
+            self.drop_answer(pending.msg_id)
+            raise TimeoutError("Request timed out")
+
+        if isinstance(result, raw.types.RpcError):
+            if isinstance(
+                data,
+                (
+                    raw.functions.InvokeWithoutUpdates,
+                    raw.functions.InvokeWithTakeout,
+                ),
+            ):
+                data = data.query
+
+            RPCError.raise_it(result, type(data))
+
+        # Sent again with the same body, which still carries initConnection if this one did
+        if isinstance(result, raw.types.BadMsgNotification) and result.error_code in (16, 17):
+            result = await self.send(data, wait_response, timeout, serialized)
+        elif isinstance(result, raw.types.BadMsgNotification):
+            log.warning(
+                "%s: %s",
+                BadMsgNotification.__name__,
+                BadMsgNotification(result.error_code),
+            )
+        elif isinstance(result, raw.types.BadServerSalt):
+            # The known future salts can't be trusted anymore, until they are asked again
+            self.salt = result.new_server_salt
+            self.future_salts.clear()
+            self.salt_task_event.set()
 
-            if isinstance(result, raw.types.RpcError):
-                if isinstance(
-                    data,
-                    (
-                        raw.functions.InvokeWithoutUpdates,
-                        raw.functions.InvokeWithTakeout,
-                    ),
-                ):
-                    data = data.query
+            result = await self.send(data, wait_response, timeout, serialized)
 
-                RPCError.raise_it(result, type(data))
+        if wraps_init and not isinstance(result, raw.types.BadMsgNotification):
+            self.init_connection_pending = False
 
-            if isinstance(result, raw.types.BadMsgNotification):
-                log.warning(
-                    "%s: %s",
-                    BadMsgNotification.__name__,
-                    BadMsgNotification(result.error_code),
-                )
+        return result
 
-            if isinstance(result, raw.types.BadServerSalt):
-                self.salt = result.new_server_salt
-                return await self.send(data, wait_response, timeout)
+    def drop_answer(self, msg_id: int):
+        # Tell the server the answer to a request nobody waits for anymore is not needed. The message is queued
+        # without waiting for it to be sent, so that this also works from a task that is being cancelled
+        if self.send_task is None or self.send_task.done():
+            return
 
-            return result
-        return None
+        sent = self.client.loop.create_future()
+        sent.add_done_callback(lambda f: f.cancelled() or f.exception())
+
+        self.send_queue.append((self.msg_factory(raw.functions.RpcDropAnswer(req_msg_id=msg_id)), sent))
+        self.send_event.set()
 
     async def invoke(
         self,
@@ -419,9 +1014,18 @@ class Session:
         retries: int = MAX_RETRIES,
         timeout: float = WAIT_TIMEOUT,
         sleep_threshold: float = SLEEP_THRESHOLD,
+        deadline: float = None,
     ):
+        loop = self.client.loop
+
+        # The deadline bounds the whole call: waiting for a free slot, every retry and every flood wait
+        expires_at = None if deadline is None else loop.time() + deadline
+
         with contextlib.suppress(asyncio.TimeoutError):
-            await asyncio.wait_for(self.is_started.wait(), self.WAIT_TIMEOUT)
+            await asyncio.wait_for(
+                self.is_started.wait(),
+                self.WAIT_TIMEOUT if deadline is None else min(self.WAIT_TIMEOUT, deadline)
+            )
 
         if isinstance(
             query, (raw.functions.InvokeWithoutUpdates, raw.functions.InvokeWithTakeout)
@@ -433,6 +1037,14 @@ class Session:
         query_name = ".".join(inner_query.QUALNAME.split(".")[1:])
 
         while retries > 0:
+            left = None if expires_at is None else expires_at - loop.time()
+
+            if left is not None and left <= 0:
+                raise TimeoutError("Request deadline exceeded")
+
+            # Set when the deadline cut a wait short: only this request ran out of time, the connection is fine
+            expired = False
+
             try:
                 if (
                     self.connection is None
@@ -447,13 +1059,29 @@ class Session:
                     await asyncio.sleep(1)
                     continue
 
-                return await self.send(query, timeout=timeout)
+                try:
+                    await asyncio.wait_for(self.limiter.acquire(query_name), left)
+                except asyncio.TimeoutError:
+                    expired = True
+                    raise TimeoutError("Request deadline exceeded") from None
+
+                try:
+                    return await self.send(query, timeout=timeout if left is None else min(timeout, left))
+                except TimeoutError:
+                    expired = left is not None and left < timeout
+                    raise
+                finally:
+                    self.limiter.release()
             except (FloodWait, FloodPremiumWait) as e:
                 amount = e.value
 
                 if amount > sleep_threshold >= 0:
                     raise
 
+                # Waiting would only end past the deadline
+                if expires_at is not None and loop.time() + amount > expires_at:
+                    raise
+
                 log.warning(
                     '[%s] Waiting for %s seconds before continuing (required by "%s")',
                     self.client.name,
@@ -463,6 +1091,9 @@ class Session:
 
                 await asyncio.sleep(amount)
             except (OSError, InternalServerError, ServiceUnavailable) as e:
+                if expired:
+                    raise TimeoutError("Request deadline exceeded") from None
+
                 retries -= 1
                 if retries == 0:
                     raise e
@@ -484,6 +1115,6 @@ class Session:
                             str(restart_error) or repr(restart_error),
                         )
 
-                await asyncio.sleep(0.5)
+                await asyncio.sleep(0.5 if expires_at is None else max(0, min(0.5, expires_at - loop.time())))
 
         raise TimeoutError("Exceeded maximum number of retries")
@@ -0,0 +1,189 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+
+from __future__ import annotations
+
+import asyncio
+import logging
+
+import pyrogram
+from pyrogram import raw
+from pyrogram.errors import AuthBytesInvalid
+
+from .auth import Auth
+from .session import Session
+
+log = logging.getLogger(__name__)
+
+
+class SessionPool:
+    """A small set of media sessions connected to the same DC and sharing one auth key.
+
+    Sessions are created lazily, up to *size*, and handed out in a round-robin fashion so that
+    concurrent file parts are spread over several connections, idle ones first: the pool only grows
+    when all of them are busy. They are kept open between transfers and are only stopped together
+    with the pool, when the client terminates, or once their connection is closed for good. The same
+    goes for the auth key, which is only generated once for DCs other than the home one.
+    """
+
+    IMPORT_AUTH_RETRIES = 3
+
+    def __init__(self, client: pyrogram.Client, dc_id: int, size: int, is_cdn: bool = False):
+        self.client = client
+        self.dc_id = dc_id
+        self.size = max(1, size)
+        self.is_cdn = is_cdn
+
+        self.auth_key: bytes | None = None
+        self.is_authorized = False
+
+        self.sessions: list[Session] = []
+        self.index = 0
+        # Sessions being created, their slots are reserved while they connect without holding the lock
+        self.creating = 0
+
+        self.lock = asyncio.Lock()
+        self.changed = asyncio.Condition(self.lock)
+
+    async def get(self) -> Session:
+        session = None
+        closed = []
+
+        async with self.changed:
+            while True:
+                closed += [s for s in self.sessions if self.is_closed(s)]
+                self.sessions = [s for s in self.sessions if s not in closed]
+
+                # Skip sessions that are reconnecting, unless all of them are
+                healthy = [s for s in self.sessions if s.is_started.is_set()]
+                session = self.next_session([s for s in healthy if s.limiter.in_flight == 0])
+
+                if session is not None:
+                    break
+
+                if len(self.sessions) + self.creating < self.size:
+                    self.creating += 1
+                    break
+
+                if self.sessions:
+                    session = self.next_session(healthy or self.sessions)
+                    break
+
+                # The first sessions are still being created
+                await self.changed.wait()
+
+        for s in closed:
+            await s.stop()
+
+        if session is not None:
+            return session
+
+        try:
+            session = await self.create_session()
+        except (OSError, TimeoutError) as e:
+            if not self.sessions:
+                raise
+
+            log.warning("Unable to open a new media session to DC%s: %s", self.dc_id, e)
+        finally:
+            async with self.changed:
+                self.creating -= 1
+
+                if session is not None:
+                    self.sessions.append(session)
+
+                self.changed.notify_all()
+
+        return session or self.next_session(self.sessions)
+
+    def next_session(self, sessions: list[Session]) -> Session | None:
+        if not sessions:
+            return None
+
+        session = sessions[self.index % len(sessions)]
+        self.index += 1
+
+        return session
+
+    @staticmethod
+    def is_closed(session: Session) -> bool:
+        # Stopped and not reconnecting, its connection closed: the session is only in the way of a new one
+        connection = session.connection
+
+        return (
+            not session.is_started.is_set()
+            and not session.restart_lock.locked()
+            and (connection is None or getattr(connection.protocol, "closed", True))
+        )
+
+    async def create_session(self) -> Session:
+        test_mode = await self.client.storage.test_mode()
+        is_home_dc = not self.is_cdn and self.dc_id == await self.client.storage.dc_id()
+
+        if self.auth_key is None:
+            self.auth_key = (
+                await self.client.storage.auth_key()
+                if is_home_dc
+                else await Auth(self.client, self.dc_id, test_mode).create()
+            )
+
+        session = Session(self.client, self.dc_id, self.auth_key, test_mode, is_media=True, is_cdn=self.is_cdn)
+
+        await session.start()
+
+        # CDN data centers serve files without any authorization
+        if not is_home_dc and not self.is_cdn and not self.is_authorized:
+            try:
+                await self.import_authorization(session)
+            except BaseException:
+                await session.stop()
+                raise
+
+        return session
+
+    async def import_authorization(self, session: Session):
+        for _ in range(self.IMPORT_AUTH_RETRIES):
+            exported_auth = await self.client.invoke(
+                raw.functions.auth.ExportAuthorization(
+                    dc_id=self.dc_id
+                )
+            )
+
+            try:
+                await session.invoke(
+                    raw.functions.auth.ImportAuthorization(
+                        id=exported_auth.id,
+                        bytes=exported_auth.bytes
+                    )
+                )
+            except AuthBytesInvalid:
+                continue
+            else:
+                self.is_authorized = True
+                break
+        else:
+            raise AuthBytesInvalid
+
+    async def stop(self):
+        async with self.lock:
+            for session in self.sessions:
+                await session.stop()
+
+            self.sessions.clear()
+            self.index = 0
@@ -49,6 +49,18 @@ class FileStorage(SQLiteStorage):
 
             version += 1
 
+        if version == 3:
+            with self.conn:
+                self.conn.execute(
+                    "CREATE TABLE dc_options ("
+                    "dc_id INTEGER NOT NULL, ip_address TEXT NOT NULL, port INTEGER NOT NULL, "
+                    "test_mode INTEGER NOT NULL, ipv6 INTEGER NOT NULL, media_only INTEGER NOT NULL, "
+                    "tcpo_only INTEGER NOT NULL, cdn INTEGER NOT NULL, static INTEGER NOT NULL, "
+                    "PRIMARY KEY (dc_id, ip_address, port, test_mode))"
+                )
+
+            version += 1
+
         self.version(version)
 
     async def open(self):
@@ -53,6 +53,20 @@ CREATE TABLE version
     number INTEGER PRIMARY KEY
 );
 
+CREATE TABLE dc_options
+(
+    dc_id      INTEGER NOT NULL,
+    ip_address TEXT    NOT NULL,
+    port       INTEGER NOT NULL,
+    test_mode  INTEGER NOT NULL,
+    ipv6       INTEGER NOT NULL,
+    media_only INTEGER NOT NULL,
+    tcpo_only  INTEGER NOT NULL,
+    cdn        INTEGER NOT NULL,
+    static     INTEGER NOT NULL,
+    PRIMARY KEY (dc_id, ip_address, port, test_mode)
+);
+
 CREATE INDEX idx_peers_id ON peers (id);
 CREATE INDEX idx_peers_username ON peers (username);
 CREATE INDEX idx_peers_phone_number ON peers (phone_number);
@@ -90,7 +104,7 @@ def get_input_peer(peer_id: int, access_hash: int, peer_type: str):
 
 
 class SQLiteStorage(Storage):
-    VERSION = 3
+    VERSION = 4
     USERNAME_TTL = 8 * 60 * 60
 
     def __init__(self, name: str):
@@ -132,6 +146,23 @@ class SQLiteStorage(Storage):
             peers
         )
 
+    async def update_dc_options(self, dc_options: List[Tuple[int, str, int, bool, bool, bool, bool, bool, bool]]):
+        with self.conn:
+            self.conn.execute("DELETE FROM dc_options")
+            self.conn.executemany(
+                "REPLACE INTO dc_options (dc_id, ip_address, port, test_mode, ipv6, media_only, tcpo_only, cdn, static)"
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                dc_options
+            )
+
+    async def get_dc_options(self):
+        return [
+            (dc_id, ip_address, port, *map(bool, flags))
+            for dc_id, ip_address, port, *flags in self.conn.execute(
+                "SELECT dc_id, ip_address, port, test_mode, ipv6, media_only, tcpo_only, cdn, static FROM dc_options"
+            )
+        ]
+
     async def get_peer_by_id(self, peer_id: int):
         r = self.conn.execute(
             "SELECT id, access_hash, type FROM peers WHERE id = ?",
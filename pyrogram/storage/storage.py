@@ -47,6 +47,12 @@ class Storage:
     async def update_peers(self, peers: List[Tuple[int, int, str, str, str]]):
         raise NotImplementedError
 
+    async def update_dc_options(self, dc_options: List[Tuple[int, str, int, bool, bool, bool, bool, bool, bool]]):
+        raise NotImplementedError
+
+    async def get_dc_options(self):
+        raise NotImplementedError
+
     async def get_peer_by_id(self, peer_id: int):
         raise NotImplementedError
 